@@ -1,7 +1,9 @@
 import streamlit as st
 import pandas as pd
 import numpy as np
-from scipy.optimize import linprog
+import functools
+import heapq
+import os
 import traceback
 from analytics import (
     identify_user, 
@@ -12,17 +14,26 @@ from analytics import (
 )
 from streamlit_javascript import st_javascript
 from user_agents import parse
-from ai_utils import get_ai_response, OPENAI_AVAILABLE
+from ai_utils import stream_ai_response, OPENAI_AVAILABLE
 from prompt_templates import generate_suggestions, SYSTEM_PROMPTS
 from sanitization import sanitize_user_input, sanitize_ai_output
 from session_handler import (
     initialize_chat_session, update_chat_with_calculation,
     add_user_message, add_assistant_message, get_api_messages
 )
+from bank_params import Reqs, build_bank_params, calculate_total_interest, summarize_dbs_requirements
+from bank_curves import interest_curve
 
 
-def calculate_bank_interest(deposit_amount, bank_info, bank_requirements):
+def calculate_bank_interest(deposit_amount, bank_info, bank_requirements, return_breakdown=True):
     """Calculate interest based on the bank's tier structure and requirements"""
+    if not return_breakdown:
+        # Totals alone come from the NumPy params packed at load time, skipping the tier dicts
+        return {
+            'total_interest': calculate_total_interest(deposit_amount, bank_info, bank_requirements),
+            'breakdown': []
+        }
+
     total_interest = 0
     breakdown = []
     
@@ -42,39 +53,39 @@ def calculate_bank_interest(deposit_amount, bank_info, bank_requirements):
 
     if bank_info['bank'] == 'SC BonusSaver':
         # Get requirement thresholds from tiers
-        salary_tier = next(t for t in bank_info['tiers'] if t['tier_type'] == 'salary')
-        spend_tier = next(t for t in bank_info['tiers'] if t['tier_type'] == 'spend')
-        min_salary = float(salary_tier['min_salary'])
-        min_spend = float(spend_tier['min_spend'])
+        salary_tier = bank_info['by_type']['salary'][0]
+        spend_tier = bank_info['by_type']['spend'][0]
+        min_salary = salary_tier['min_salary_value']
+        min_spend = spend_tier['min_spend_value']
         
         # Always add base interest for total balance
-        base_tier = next(t for t in bank_info['tiers'] if t['tier_type'] == 'base')
-        base_rate = float(str(base_tier['interest_rate']).strip('%')) / 100
+        base_tier = bank_info['by_type']['base'][0]
+        base_rate = base_tier['rate']
         total_interest += add_tier(deposit_amount, base_rate, "Base Interest")
         
         # Cap bonus interest at $100,000
         eligible_amount = min(deposit_amount, 100000)
         
         # Add salary bonus if applicable
-        if bank_requirements['has_salary'] and bank_requirements['salary_amount'] >= min_salary:
-            rate = float(str(salary_tier['interest_rate']).strip('%')) / 100
+        if bank_requirements.has_salary and bank_requirements.salary_amount >= min_salary:
+            rate = salary_tier['rate']
             total_interest += add_tier(eligible_amount, rate, f"Salary Credit Bonus (>= ${min_salary:,.0f})")
         
         # Add spend bonus if applicable
-        if bank_requirements['spend_amount'] >= min_spend:
-            rate = float(str(spend_tier['interest_rate']).strip('%')) / 100
+        if bank_requirements.spend_amount >= min_spend:
+            rate = spend_tier['rate']
             total_interest += add_tier(eligible_amount, rate, f"Card Spend Bonus (>= ${min_spend:,.0f})")
         
         # Add investment bonus if applicable
-        if bank_requirements['has_investments']:
-            invest_tier = next(t for t in bank_info['tiers'] if t['tier_type'] == 'invest')
-            rate = float(str(invest_tier['interest_rate']).strip('%')) / 100
+        if bank_requirements.has_investments:
+            invest_tier = bank_info['by_type']['invest'][0]
+            rate = invest_tier['rate']
             total_interest += add_tier(eligible_amount, rate, "Investment Bonus (6 months)")
         
         # Add insurance bonus if applicable
-        if bank_requirements['has_insurance']:
-            insure_tier = next(t for t in bank_info['tiers'] if t['tier_type'] == 'insure')
-            rate = float(str(insure_tier['interest_rate']).strip('%')) / 100
+        if bank_requirements.has_insurance:
+            insure_tier = bank_info['by_type']['insure'][0]
+            rate = insure_tier['rate']
             total_interest += add_tier(eligible_amount, rate, "Insurance Bonus (6 months)")
             
     elif bank_info['bank'] == 'UOB One':
@@ -82,9 +93,9 @@ def calculate_bank_interest(deposit_amount, bank_info, bank_requirements):
         total_interest = 0
         
         # Check if minimum spend requirement is met
-        has_spend = bank_requirements['spend_amount'] >= 500
-        has_salary = bank_requirements['has_salary']
-        has_giro = bank_requirements['giro_count'] >= 3
+        has_spend = bank_requirements.spend_amount >= 500
+        has_salary = bank_requirements.has_salary
+        has_giro = bank_requirements.giro_count >= 3
         
         if has_spend:
             # If minimum spend met, check for highest applicable bonus rate
@@ -92,12 +103,12 @@ def calculate_bank_interest(deposit_amount, bank_info, bank_requirements):
             
             # Check salary + spend first as it has highest rates
             if has_salary:
-                tiers = [t for t in bank_info['tiers'] if t['requirement_type'] == 'salary']
+                tiers = bank_info['by_requirement']['salary']
                 for tier in tiers:
-                    amount_in_tier = min(remaining_amount, float(tier['cap_amount']))
+                    amount_in_tier = min(remaining_amount, tier['cap'])
                     if amount_in_tier <= 0:
                         break
-                    rate = float(str(tier['interest_rate']).strip('%')) / 100
+                    rate = tier['rate']
                     interest = amount_in_tier * rate
                     total_interest += interest
                     add_tier(amount_in_tier, rate,
@@ -106,12 +117,12 @@ def calculate_bank_interest(deposit_amount, bank_info, bank_requirements):
             
             # Then check GIRO + Spend
             elif has_giro:
-                tiers = [t for t in bank_info['tiers'] if t['requirement_type'] == 'giro']
+                tiers = bank_info['by_requirement']['giro']
                 for tier in tiers:
-                    amount_in_tier = min(remaining_amount, float(tier['cap_amount']))
+                    amount_in_tier = min(remaining_amount, tier['cap'])
                     if amount_in_tier <= 0:
                         break
-                    rate = float(str(tier['interest_rate']).strip('%')) / 100
+                    rate = tier['rate']
                     interest = amount_in_tier * rate
                     total_interest += interest
                     add_tier(amount_in_tier, rate,
@@ -120,12 +131,12 @@ def calculate_bank_interest(deposit_amount, bank_info, bank_requirements):
             
             # Finally apply spend only rates
             else:
-                tiers = [t for t in bank_info['tiers'] if t['requirement_type'] == 'spend_only']
+                tiers = bank_info['by_requirement']['spend_only']
                 for tier in tiers:
-                    amount_in_tier = min(remaining_amount, float(tier['cap_amount']))
+                    amount_in_tier = min(remaining_amount, tier['cap'])
                     if amount_in_tier <= 0:
                         break
-                    rate = float(str(tier['interest_rate']).strip('%')) / 100
+                    rate = tier['rate']
                     interest = amount_in_tier * rate
                     total_interest += interest
                     add_tier(amount_in_tier, rate,
@@ -134,17 +145,17 @@ def calculate_bank_interest(deposit_amount, bank_info, bank_requirements):
         
         else:
             # If minimum spend not met, only apply base interest
-            base_tier = next(t for t in bank_info['tiers'] if t['tier_type'] == 'base')
-            base_rate = float(str(base_tier['interest_rate']).strip('%')) / 100
-            base_amount = min(deposit_amount, float(base_tier['cap_amount']))
+            base_tier = bank_info['by_type']['base'][0]
+            base_rate = base_tier['rate']
+            base_amount = min(deposit_amount, base_tier['cap'])
             base_interest = base_amount * base_rate
             total_interest += base_interest
             add_tier(base_amount, base_rate, f"Base Interest ({base_tier['balance_tier']})")
     
     elif bank_info['bank'] == 'OCBC 360':
         # Always add base interest first for total amount
-        base_tier = next(t for t in bank_info['tiers'] if t['tier_type'] == 'base')
-        base_rate = float(str(base_tier['interest_rate']).strip('%')) / 100
+        base_tier = bank_info['by_type']['base'][0]
+        base_rate = base_tier['rate']
         total_interest = deposit_amount * base_rate
         add_tier(deposit_amount, base_rate, "Base Interest")
         
@@ -152,52 +163,43 @@ def calculate_bank_interest(deposit_amount, bank_info, bank_requirements):
         first_75k = min(deposit_amount, 75000)
         next_25k = min(max(deposit_amount - 75000, 0), 25000)
         
-        # Base calculations for each amount
-        total_first_75k = 0
-        total_next_25k = 0
-        
         def process_ocbc_tier(tier_type, requirement_met):
-            nonlocal total_first_75k, total_next_25k
-            if requirement_met:
-                tier_75k = next((t for t in bank_info['tiers'] if t['tier_type'] == tier_type and float(t['cap_amount']) == 75000), None)
-                tier_25k = next((t for t in bank_info['tiers'] if t['tier_type'] == tier_type and float(t['cap_amount']) == 25000), None)
-                
-                if tier_75k:
-                    rate = float(str(tier_75k['interest_rate']).strip('%')) / 100
-                    interest_75k = first_75k * rate
-                    total_first_75k += interest_75k
-                    add_tier(first_75k, rate, f"{tier_75k['remarks']}")
-                
-                if tier_25k:
-                    rate = float(str(tier_25k['interest_rate']).strip('%')) / 100
-                    interest_25k = next_25k * rate
-                    total_next_25k += interest_25k
-                    add_tier(next_25k, rate, f"{tier_25k['remarks']}")
+            """Interest from one bonus category on the first $75k and next $25k"""
+            if not requirement_met:
+                return 0
+            interest = 0
+            tier_75k = bank_info['by_type_and_cap'].get((tier_type, 75000.0))
+            tier_25k = bank_info['by_type_and_cap'].get((tier_type, 25000.0))
+            
+            if tier_75k:
+                interest += add_tier(first_75k, tier_75k['rate'], f"{tier_75k['remarks']}")
+            
+            if tier_25k:
+                interest += add_tier(next_25k, tier_25k['rate'], f"{tier_25k['remarks']}")
+            return interest
         
         # Check each bonus category
         # Salary bonus
-        salary_tier = next(t for t in bank_info['tiers'] if t['tier_type'] == 'salary')
-        has_salary = bank_requirements['has_salary'] and bank_requirements['salary_amount'] >= float(salary_tier['min_salary'])
-        process_ocbc_tier('salary', has_salary)
+        salary_tier = bank_info['by_type']['salary'][0]
+        has_salary = bank_requirements.has_salary and bank_requirements.salary_amount >= salary_tier['min_salary_value']
+        total_interest += process_ocbc_tier('salary', has_salary)
         
         # Save bonus (increased balance)
-        process_ocbc_tier('save', bank_requirements.get('increased_balance', False))
+        total_interest += process_ocbc_tier('save', bank_requirements.increased_balance)
         
         # Spend bonus
-        spend_tier = next(t for t in bank_info['tiers'] if t['tier_type'] == 'spend')
-        has_spend = bank_requirements['spend_amount'] >= float(spend_tier['min_spend'])
-        process_ocbc_tier('spend', has_spend)
+        spend_tier = bank_info['by_type']['spend'][0]
+        has_spend = bank_requirements.spend_amount >= spend_tier['min_spend_value']
+        total_interest += process_ocbc_tier('spend', has_spend)
         
         # Insurance bonus
-        process_ocbc_tier('insure', bank_requirements.get('has_insurance', False))
+        total_interest += process_ocbc_tier('insure', bank_requirements.has_insurance)
         
         # Investment bonus
-        process_ocbc_tier('invest', bank_requirements.get('has_investments', False))
+        total_interest += process_ocbc_tier('invest', bank_requirements.has_investments)
         
         # Grow bonus
-        process_ocbc_tier('grow', bank_requirements.get('grew_wealth', False))
-        
-        total_interest += total_first_75k + total_next_25k
+        total_interest += process_ocbc_tier('grow', bank_requirements.grew_wealth)
     
     elif bank_info['bank'] == 'BOC SmartSaver':
         # Initialize total interest
@@ -205,112 +207,85 @@ def calculate_bank_interest(deposit_amount, bank_info, bank_requirements):
         remaining_amount = deposit_amount
 
         # Process base interest tiers
-        base_tiers = [t for t in bank_info['tiers'] if t['tier_type'] == 'base']
-        # Sort tiers by cap_amount to process in ascending order
-        base_tiers = sorted(base_tiers, key=lambda x: float(x['cap_amount']))
-        
-        # Track previous tier cap for tier calculation
-        prev_cap = 0
-        for tier in base_tiers:
-            cap = float(tier['cap_amount'])
-            tier_size = cap - prev_cap
-            amount_in_tier = min(max(0, remaining_amount - prev_cap), tier_size)
-            
+        # Base tiers are presorted by cap_amount; each tier spans from the previous cap to its own
+        base_caps = bank_info['boc_base_caps']
+        base_rates = bank_info['boc_base_rates']
+        prev_caps = np.concatenate(([0.0], base_caps[:-1]))
+        amounts_in_tier = np.clip(remaining_amount - prev_caps, 0, base_caps - prev_caps)
+        total_interest += float(amounts_in_tier @ base_rates)
+
+        for tier, amount_in_tier in zip(bank_info['boc_base_tiers'], amounts_in_tier):
             if amount_in_tier <= 0:
                 break
-                
-            rate = float(str(tier['interest_rate']).strip('%')) / 100
-            interest = amount_in_tier * rate
-            total_interest += interest
-            add_tier(amount_in_tier, rate, f"Base Interest ({tier['balance_tier']})")
-            prev_cap = cap
+            add_tier(amount_in_tier, tier['rate'], f"Base Interest ({tier['balance_tier']})")
         
         # Add bonus interest based on requirements
         if deposit_amount >= 1500:  # Minimum balance requirement
             # Process salary credit bonus if applicable
-            if bank_requirements.get('has_salary', False) and bank_requirements.get('salary_amount', 0) >= 2000:
-                salary_tier = next(t for t in bank_info['tiers'] if t['tier_type'] == 'salary')
-                rate = float(str(salary_tier['interest_rate']).strip('%')) / 100
-                bonus_amount = min(deposit_amount, float(salary_tier['cap_amount']))
+            if bank_requirements.has_salary and bank_requirements.salary_amount >= 2000:
+                salary_tier = bank_info['by_type']['salary'][0]
+                rate = salary_tier['rate']
+                bonus_amount = min(deposit_amount, salary_tier['cap'])
                 interest = bonus_amount * rate
                 total_interest += interest
                 add_tier(bonus_amount, rate, "Salary Credit Bonus (≥$2,000)")
 
             # Process wealth bonus if applicable
-            if bank_requirements.get('has_insurance', False):
-                wealth_tier = next(t for t in bank_info['tiers'] if t['tier_type'] == 'wealth')
-                rate = float(str(wealth_tier['interest_rate']).strip('%')) / 100
-                bonus_amount = min(deposit_amount, float(wealth_tier['cap_amount']))
+            if bank_requirements.has_insurance:
+                wealth_tier = bank_info['by_type']['wealth'][0]
+                rate = wealth_tier['rate']
+                bonus_amount = min(deposit_amount, wealth_tier['cap'])
                 interest = bonus_amount * rate
                 total_interest += interest
                 add_tier(bonus_amount, rate, "Wealth Bonus (Insurance)")
             
             # Process spend bonus if applicable
-            spend_amount = bank_requirements.get('spend_amount', 0)
+            spend_amount = bank_requirements.spend_amount
             if spend_amount >= 500:
                 # Get appropriate spend tier based on amount
-                spend_tiers = [t for t in bank_info['tiers'] if t['tier_type'] == 'spend']
-                spend_tier = None
-                if spend_amount >= 1500:
-                    spend_tier = next(t for t in spend_tiers if t['balance_tier'] == '2')
-                else:
-                    spend_tier = next(t for t in spend_tiers if t['balance_tier'] == '1')
+                balance_tier = '2' if spend_amount >= 1500 else '1'
+                spend_tier = bank_info['by_type_and_balance_tier'][('spend', balance_tier)]
                 
-                rate = float(str(spend_tier['interest_rate']).strip('%')) / 100
-                bonus_amount = min(deposit_amount, float(spend_tier['cap_amount']))
+                rate = spend_tier['rate']
+                bonus_amount = min(deposit_amount, spend_tier['cap'])
                 interest = bonus_amount * rate
                 total_interest += interest
                 add_tier(bonus_amount, rate, f"Spend Bonus (${spend_amount:,.0f})")
 
             # Process payment bonus if applicable
-            giro_count = bank_requirements.get('giro_count', 0)
+            giro_count = bank_requirements.giro_count
             if giro_count >= 3:
-                payment_tier = next(t for t in bank_info['tiers'] if t['tier_type'] == 'payment')
-                rate = float(str(payment_tier['interest_rate']).strip('%')) / 100
-                bonus_amount = min(deposit_amount, float(payment_tier['cap_amount']))
+                payment_tier = bank_info['by_type']['payment'][0]
+                rate = payment_tier['rate']
+                bonus_amount = min(deposit_amount, payment_tier['cap'])
                 interest = bonus_amount * rate
                 total_interest += interest
                 add_tier(bonus_amount, rate, f"Payment Bonus ({giro_count} bill payments)")
     
     elif bank_info['bank'] == 'Chocolate':
-        # First add base interest for total amount
-        base_tier = next(t for t in bank_info['tiers'] if t['tier_type'] == 'base')
-        base_rate = float(str(base_tier['interest_rate']).strip('%')) / 100
-        total_interest = deposit_amount * base_rate
-        # add_tier(deposit_amount, base_rate, "Base Interest")
-        
-        # Then add bonus interest for tiered amounts
+        # The tiered rates already include the base rate, so only the tiers are applied
         first_20k = min(deposit_amount, 20000)
         next_30k = min(max(deposit_amount - 20000, 0), 30000)
         
-        # First $20,000 at 3.60%
-        first_20k = min(deposit_amount, 20000)
-        first_tier = next(t for t in bank_info['tiers'] if t['tier_type'] == 'base' and float(t['cap_amount']) == 20000)
-        rate_20k = float(str(first_tier['interest_rate']).strip('%')) / 100
-        interest_20k = first_20k * rate_20k
-        total_interest = interest_20k
-        add_tier(first_20k, rate_20k, "First $20,000")
+        # First $20,000
+        rate_20k = bank_info['by_type_and_cap'][('base', 20000.0)]['rate']
+        total_interest = add_tier(first_20k, rate_20k, "First $20,000")
         
-        # Next $30,000 at 3.20%
+        # Next $30,000
         if deposit_amount > 20000:
-            next_30k = min(deposit_amount - 20000, 30000)
-            second_tier = next(t for t in bank_info['tiers'] if t['tier_type'] == 'base' and float(t['cap_amount']) == 30000)
-            rate_30k = float(str(second_tier['interest_rate']).strip('%')) / 100
-            interest_30k = next_30k * rate_30k
-            total_interest += interest_30k
-            add_tier(next_30k, rate_30k, "Next $30,000")
+            rate_30k = bank_info['by_type_and_cap'][('base', 30000.0)]['rate']
+            total_interest += add_tier(next_30k, rate_30k, "Next $30,000")
     
     elif bank_info['bank'] == 'DBS Multiplier':
         # Step 1: Check salary credit prerequisite
-        if not bank_requirements['has_salary']:
+        if not bank_requirements.has_salary:
             # If no salary credit, only base interest applies to entire amount
             base_rate = 0.0005  # 0.05%
             total_interest += add_tier(deposit_amount, base_rate, "Base Interest (No Salary Credit)")
             return {'total_interest': total_interest, 'breakdown': breakdown}
         
-        # Step 2: Calculate total eligible transactions and category count
-        total_transactions = calculate_dbs_eligible_transactions(bank_requirements)
-        category_count = count_dbs_categories(bank_requirements)
+        # Step 2: Calculate total eligible transactions and category count in one pass
+        total_transactions, category_count = summarize_dbs_requirements(bank_requirements)
         
         # Step 3: Check minimum transaction requirement
         if total_transactions < 500 or category_count == 0:
@@ -331,9 +306,9 @@ def calculate_bank_interest(deposit_amount, bank_info, bank_requirements):
         
         # Step 5: Get the matching tier from bank_info
         try:
-            tier = next(t for t in bank_info['tiers'] if t['tier_type'] == tier_type)
-            rate = float(str(tier['interest_rate']).strip('%')) / 100
-            cap_amount = float(tier['cap_amount'])
+            tier = bank_info['by_type'][tier_type][0]
+            rate = tier['rate']
+            cap_amount = tier['cap']
             
             # Step 6: Apply bonus interest to eligible amount
             eligible_amount = min(deposit_amount, cap_amount)
@@ -348,7 +323,7 @@ def calculate_bank_interest(deposit_amount, bank_info, bank_requirements):
                 total_interest += add_tier(remaining, base_rate, 
                     "Base Interest (Amount Above Cap)")
                 
-        except StopIteration:
+        except KeyError:
             # Handle case where no matching tier is found
             st.error(f"No matching interest rate tier found for {tier_type}")
             base_rate = 0.0005  # 0.05%
@@ -360,70 +335,103 @@ def calculate_bank_interest(deposit_amount, bank_info, bank_requirements):
         'breakdown': breakdown
     }
 
-def process_interest_rates(file_path='interest_rates.csv'):
-    """Process interest rates from CSV file"""
-    print("Starting to process interest rates...")
-    df = pd.read_csv(file_path)
-    print(f"Loaded CSV with {len(df)} rows")
+INTEREST_RATES_FILE = 'interest_rates.csv'
+
+# Fixed order the banks are calculated and optimized in (requirement order is fixed by Reqs)
+_BANK_ORDER = ("UOB One", "SC BonusSaver", "OCBC 360", "BOC SmartSaver", "Chocolate", "DBS Multiplier")
+
+# Column types for interest_rates.csv so pandas does not have to infer them
+INTEREST_RATE_DTYPES = {
+    'bank': str,
+    'tier_type': str,
+    'balance_tier': str,
+    'interest_rate': str,
+    'requirement_type': str,
+    'min_spend': float,
+    'min_salary': float,
+    'giro_count': float,
+    'salary_credit': str,
+    'cap_amount': float,
+    'remarks': str
+}
+
+@st.cache_resource(show_spinner=False)
+def process_interest_rates(file_path=INTEREST_RATES_FILE, file_mtime=None):
+    """
+    Process interest rates from CSV file
+    file_mtime is only part of the cache key, so editing the CSV invalidates the cached result
+    The result is shared across reruns and sessions, so callers must not modify it
+    """
+    df = pd.read_csv(file_path, dtype=INTEREST_RATE_DTYPES)
     banks_data = {}
-    
-    # Group by bank
-    for bank_name, bank_group in df.groupby('bank'):
-        #print(f"\nProcessing bank: {bank_name}")
+
+    # Build tiers straight from plain dict records rather than boxing each row into a Series
+    for row in df.to_dict(orient='records'):
         try:
-            # Initialize bank data
-            banks_data[bank_name] = {
-                'bank': bank_name,
-                'tiers': []
+            tier = {
+                'tier_type': row['tier_type'],
+                'balance_tier': row['balance_tier'],
+                'interest_rate': row['interest_rate'],
+                'requirement_type': row['requirement_type'],
+                'min_spend': row['min_spend'],
+                'min_salary': row['min_salary'],
+                'giro_count': row['giro_count'],
+                'salary_credit': row['salary_credit'],
+                'cap_amount': row['cap_amount'],
+                'remarks': row['remarks'],
+                # Numeric copies parsed once here so calculate_bank_interest reads plain floats
+                'rate': float(str(row['interest_rate']).strip('%')) / 100,
+                'cap': float(row['cap_amount']) if pd.notna(row['cap_amount']) else float('inf'),
+                'min_spend_value': float(row['min_spend']) if pd.notna(row['min_spend']) else 0.0,
+                'min_salary_value': float(row['min_salary']) if pd.notna(row['min_salary']) else 0.0
             }
-            
-            # Process all tiers
-            for _, row in bank_group.iterrows():
-                try:
-                    # Convert interest rate from percentage string to float
-                    rate = float(str(row['interest_rate']).strip('%')) / 100
-                    
-                    tier = {
-                        'tier_type': row['tier_type'],
-                        'balance_tier': row['balance_tier'],
-                        'interest_rate': row['interest_rate'],
-                        'requirement_type': row['requirement_type'],
-                        'min_spend': row['min_spend'],
-                        'min_salary': row['min_salary'],
-                        'giro_count': row['giro_count'],
-                        'salary_credit': row['salary_credit'],
-                        'cap_amount': row['cap_amount'],
-                        'remarks': row['remarks']
-                    }
-                    
-                    banks_data[bank_name]['tiers'].append(tier)
-                    #print(f"Added tier: {tier}")
-                    pass
-                    
-                except (ValueError, TypeError) as e:
-                    pass
-                    #print(f"Error processing tier: {e}")
-            
-            print(f"Successfully added {len(banks_data[bank_name]['tiers'])} tiers for {bank_name}")
-                
+        except (ValueError, TypeError) as e:
+            #print(f"Error processing tier: {e}")
+            continue
+
+        banks_data.setdefault(row['bank'], {'bank': row['bank'], 'tiers': []})['tiers'].append(tier)
+
+    for bank_name, bank_info in banks_data.items():
+        try:
+            # Index tiers once so lookups in calculate_bank_interest don't scan the whole list
+            bank_info['by_type'] = {}
+            bank_info['by_requirement'] = {}
+            bank_info['by_type_and_cap'] = {}
+            bank_info['by_type_and_balance_tier'] = {}
+            for tier in bank_info['tiers']:
+                bank_info['by_type'].setdefault(tier['tier_type'], []).append(tier)
+                bank_info['by_requirement'].setdefault(tier['requirement_type'], []).append(tier)
+                bank_info['by_type_and_cap'].setdefault((tier['tier_type'], tier['cap']), tier)
+                bank_info['by_type_and_balance_tier'].setdefault((tier['tier_type'], tier['balance_tier']), tier)
+
+            if bank_name == 'BOC SmartSaver':
+                # BOC's base tiers are filled in ascending cap order
+                base_tiers = sorted(bank_info['by_type']['base'], key=lambda t: t['cap'])
+                bank_info['boc_base_tiers'] = base_tiers
+                bank_info['boc_base_caps'] = np.array([t['cap'] for t in base_tiers])
+                bank_info['boc_base_rates'] = np.array([t['rate'] for t in base_tiers])
+
+            # Numeric tables for the optimizer's interest kernels
+            bank_info['params'] = build_bank_params(bank_info)
+
         except Exception as e:
             #print(f"Error processing {bank_name}: {e}")
             import traceback
             traceback.print_exc()
-    
+
     #print(f"\nFinished processing. Found {len(banks_data)} banks")
     return banks_data
 
-def optimize_bank_distribution(total_amount, banks_data, user_requirements):
-    print(f"\nOptimizing distribution for ${total_amount:,.2f}")
-    
-    # Initialize variables for top 3 solutions
-    top_solutions = [
-        {'distribution': {}, 'total_interest': 0, 'breakdown': {}, 'salary_bank': None},
-        {'distribution': {}, 'total_interest': 0, 'breakdown': {}, 'salary_bank': None},
-        {'distribution': {}, 'total_interest': 0, 'breakdown': {}, 'salary_bank': None}
-    ]
+@st.cache_data(show_spinner=False, max_entries=256)
+def _cached_bank_interest(bank_name, amount, reqs, file_mtime=None):
+    """calculate_bank_interest memoized on its inputs, so reruns that don't change them are free"""
+    banks_data = process_interest_rates(INTEREST_RATES_FILE, file_mtime)
+    return calculate_bank_interest(amount, banks_data[bank_name], reqs)
+
+# Deposits are distributed in whole ticks of $5000
+TICK = 5000
 
+def optimize_bank_distribution(total_amount, banks_data, user_requirements):
     # Define maximum bonus interest caps for each bank
     bonus_caps = {
         'UOB One': 150000,
@@ -432,110 +440,120 @@ def optimize_bank_distribution(total_amount, banks_data, user_requirements):
         'BOC SmartSaver': 100000,
         'Chocolate': 50000
     }
+    bonus_caps_t = {bank: cap // TICK for bank, cap in bonus_caps.items()}
 
-    # Create progress placeholders in Streamlit
+    # Create a status placeholder in Streamlit
     status_text = st.empty()
-    progress_text = st.empty()
-    best_found_text = st.empty()
-    
-    # Initialize counters
-    total_scenarios = 0
-    current_scenario = 0
-    
-    # Calculate total number of scenarios
-    def calculate_total_scenarios(amount, num_banks):
-        # Number of possible $5000 increments for each bank
-        increments_per_bank = (amount // 5000) + 1
-        # Total combinations considering all banks
-        return increments_per_bank ** num_banks
-
-    # Calculate approximate total scenarios
-    if user_requirements['has_salary']:
-        for salary_bank in ['SC BonusSaver', 'OCBC 360', 'BOC SmartSaver']:
-            total_scenarios += calculate_total_scenarios(min(total_amount, bonus_caps[salary_bank]), 4)  # 4 other banks
-    total_scenarios += calculate_total_scenarios(total_amount, 5)  # non-salary scenarios
-    
-    progress_text.write(f"Total scenarios to check: {total_scenarios:,}")
 
-    def try_combination(amounts_dict, salary_bank):
-        nonlocal current_scenario
-        current_scenario += 1
-        
-        if current_scenario % 100 == 0:  # Update more frequently since we have fewer scenarios
-            progress_text.write(f"Checking scenario {current_scenario:,} of {total_scenarios:,} ({(current_scenario/total_scenarios*100):.1f}%)")
-        
-        if abs(sum(amounts_dict.values()) - total_amount) > 5000:  # Increased tolerance for $5000 increments
-            return
-            
-        total_interest = 0
-        all_breakdowns = {}
-        
-        for bank, amount in amounts_dict.items():
-            if amount > 0:
-                bank_reqs = user_requirements.copy()
-                if bank == 'UOB One':
-                    bank_reqs['has_salary'] = user_requirements.get('has_salary', False)
-                    bank_reqs['salary_amount'] = user_requirements.get('salary_amount', 0)
-                else:
-                    bank_reqs['has_salary'] = (bank == salary_bank) and user_requirements['has_salary']
-                
-                result = calculate_bank_interest(amount, banks_data[bank], bank_reqs)
-                total_interest += result['total_interest']
-                all_breakdowns[bank] = result['breakdown']
-        
-        for i in range(len(top_solutions)):
-            if total_interest > top_solutions[i]['total_interest']:
-                for j in range(len(top_solutions)-1, i, -1):
-                    top_solutions[j] = top_solutions[j-1].copy()
-                top_solutions[i] = {
-                    'distribution': amounts_dict.copy(),
-                    'total_interest': total_interest,
-                    'breakdown': all_breakdowns,
-                    'salary_bank': salary_bank
-                }
-                best_found_text.write(f"New best found: ${total_interest:,.2f} with {amounts_dict}")
+    # Whatever is left below one tick stays unallocated
+    n_ticks = int(total_amount) // TICK
+
+    all_banks = [bank for bank in _BANK_ORDER if bank in bonus_caps]
+
+    def get_requirements_by_bank(salary_bank):
+        """Requirements of every bank, built once per salary bank scenario"""
+        reqs_by_bank = {}
+        for bank in all_banks:
+            if bank == 'UOB One':
+                # UOB One counts the salary whichever bank it is credited to
+                reqs_by_bank[bank] = user_requirements
+            else:
+                reqs_by_bank[bank] = user_requirements._replace(
+                    has_salary=(bank == salary_bank) and user_requirements.has_salary)
+        return reqs_by_bank
+
+    # Banks other than the salary bank see identical requirements in every scenario,
+    # so most tables are shared between salary-bank scenarios
+    @functools.lru_cache(maxsize=None)
+    def get_interest_table(bank, frozen_reqs):
+        """Interest earned by a bank at each tick up to its bonus cap"""
+        ticks = np.arange(min(n_ticks, bonus_caps_t[bank]) + 1)
+        return interest_curve(ticks * TICK, banks_data[bank], frozen_reqs)
+
+    def find_top_distributions(banks, reqs_by_bank, salary_bank, top_n=3):
+        """Top-N distributions of all ticks across banks (knapsack DP)"""
+        # best[j, r] is the r-th best interest when j ticks are spread over the banks seen so far
+        best = np.full((n_ticks + 1, top_n), -np.inf)
+        best[0, 0] = 0.0
+        back_pointers = []
+        # Most ticks the banks seen so far can absorb without going past their caps
+        reachable = 0
+
+        for bank in banks:
+            table = get_interest_table(bank, reqs_by_bank[bank])
+            new_best = np.full_like(best, -np.inf)
+            # pointers[j, r] = (ticks given to this bank, rank of the previous state)
+            pointers = np.zeros((n_ticks + 1, top_n, 2), dtype=np.int32)
+
+            reachable = min(reachable + len(table) - 1, n_ticks)
+            for j in range(reachable + 1):
+                # Ticks past the bank's cap are never allocated, so only its relevant points are tried
+                steps = min(j + 1, len(table))
+                # candidates[i, r] = interest of giving i ticks to this bank on top of best[j - i, r]
+                candidates = (best[j::-1][:steps] + table[:steps, None]).ravel()
+                order = np.argsort(-candidates, kind='stable')[:top_n]
+                new_best[j] = candidates[order]
+                pointers[j, :, 0], pointers[j, :, 1] = np.divmod(order, top_n)
+
+            best = new_best
+            back_pointers.append(pointers)
+
+        # Walk the back pointers to rebuild each distribution
+        solutions = []
+        for rank in range(top_n):
+            total_interest = best[-1, rank]
+            if not total_interest > 0:
                 break
 
-    def try_all_combinations(remaining_amount, remaining_banks, current_distribution, salary_bank):
-        if not remaining_banks:
-            if remaining_amount < 5000:  # If less than $5000 left, consider it a valid combination
-                try_combination(current_distribution, salary_bank)
-            return
-        
-        current_bank = remaining_banks[0]
-        next_banks = remaining_banks[1:]
-        
-        # Try different amounts in $5000 increments
-        max_amount = min(remaining_amount, bonus_caps[current_bank])
-        for amount in range(0, max_amount + 5000, 5000):  # Include 0 to skip this bank
-            if amount <= max_amount:
-                new_distribution = current_distribution.copy()
-                if amount > 0:  # Only add to distribution if amount > 0
-                    new_distribution[current_bank] = amount
-                try_all_combinations(remaining_amount - amount, next_banks, new_distribution, salary_bank)
+            ticks_left, state_rank = n_ticks, rank
+            ticks = []
+            for pointers in reversed(back_pointers):
+                bank_ticks, state_rank = pointers[ticks_left, state_rank]
+                ticks.append(int(bank_ticks))
+                ticks_left -= bank_ticks
+
+            solutions.append({
+                'ticks': tuple(reversed(ticks)),  # Ticks per bank, in the order of banks
+                'total_interest': float(total_interest),
+                'salary_bank': salary_bank
+            })
+        return solutions
 
     # Try all possible combinations
-    all_banks = ['UOB One', 'SC BonusSaver', 'OCBC 360', 'BOC SmartSaver', 'Chocolate']
-    
+    candidates = []
+    reqs_by_salary_bank = {}
+    status_text.write("Optimizing...")
+
     # First try with salary credit
-    if user_requirements['has_salary']:
+    if user_requirements.has_salary:
         for salary_bank in ['SC BonusSaver', 'OCBC 360', 'BOC SmartSaver']:
-            status_text.write(f"Trying combinations with salary credit to {salary_bank}...")
-            non_salary_banks = [bank for bank in all_banks if bank != salary_bank]
-            # Try salary bank first
-            for amount in range(0, min(total_amount + 5000, bonus_caps[salary_bank] + 5000), 5000):
-                if amount <= total_amount:
-                    initial_distribution = {salary_bank: amount} if amount > 0 else {}
-                    try_all_combinations(total_amount - amount, non_salary_banks, initial_distribution, salary_bank)
-    
+            reqs_by_salary_bank[salary_bank] = get_requirements_by_bank(salary_bank)
+            candidates.extend(find_top_distributions(all_banks, reqs_by_salary_bank[salary_bank], salary_bank))
+
     # Then try without salary credit
-    status_text.write("Trying combinations without salary credit...")
-    try_all_combinations(total_amount, ['UOB One', 'SC BonusSaver', 'OCBC 360', 'BOC SmartSaver', 'Chocolate'], {}, None)
+    reqs_by_salary_bank[None] = get_requirements_by_bank(None)
+    candidates.extend(find_top_distributions(all_banks, reqs_by_salary_bank[None], None))
+
+    # Keep the best 3 overall. On equal interest, earlier scenarios come first and, within a
+    # scenario, the DP's rank order decides (not the order the old exhaustive search found them)
+    top_solutions = []
+    for solution in heapq.nlargest(3, candidates, key=lambda x: x['total_interest']):
+        # Only the winners are converted back to dollars and get their detailed breakdowns
+        ticks = solution.pop('ticks')
+        solution['distribution'] = {bank: t * TICK for bank, t in zip(all_banks, ticks) if t > 0}
+        solution['breakdown'] = {
+            bank: calculate_bank_interest(
+                amount, banks_data[bank],
+                reqs_by_salary_bank[solution['salary_bank']][bank]
+            )['breakdown']
+            for bank, amount in solution['distribution'].items()
+        }
+        top_solutions.append(solution)
+    while len(top_solutions) < 3:
+        top_solutions.append({'distribution': {}, 'total_interest': 0, 'breakdown': {}, 'salary_bank': None})
+
+    status_text.empty()
 
-    status_text.write("Optimization complete!")
-    progress_text.empty()  # Clear the progress counter
-    best_found_text.empty()  # Clear the best found message
-    
     # Display final results
     st.write("\n### Final Top 3 Solutions:")
     for i, solution in enumerate(top_solutions):
@@ -544,9 +562,12 @@ def optimize_bank_distribution(total_amount, banks_data, user_requirements):
             st.write(f"Distribution: {solution['distribution']}")
             st.write(f"Total Interest: ${solution['total_interest']:,.2f}")
             st.write(f"Salary Bank: {solution['salary_bank']}")
-    
+
     return top_solutions
 
+# Translation table that strips the thousands separators from typed amounts
+_NO_COMMA = str.maketrans('', '', ',')
+
 def format_number(n):
     return "{:,}".format(n)
 
@@ -621,6 +642,217 @@ st.markdown("""
     </style>
 """, unsafe_allow_html=True)
 
+def _render_breakdown(breakdown):
+    """Show a bank's interest tiers, all in one element instead of one st.text per tier"""
+    st.write("Interest Breakdown:")
+    i = 0
+    try:
+        lines = []
+        for i, tier in enumerate(breakdown):
+            lines.append(f"• ${float(tier['amount_in_tier']):,.2f} at {float(tier['tier_rate']) * 100:.2f}% - {str(tier['description']).strip()}")
+        st.markdown("```\n" + "\n".join(lines) + "\n```")
+    except Exception as e:
+        st.error(f"Error formatting tier {i}: {str(e)}")
+
+def _show_all_banks():
+    st.session_state.show_all_banks = True
+
+@st.fragment
+def render_bank_results(investment_amount, base_requirements, rates_mtime):
+    """Single bank results panel, run as a fragment so it can rerun on its own"""
+    # Nothing to calculate for an empty amount
+    if investment_amount <= 0:
+        st.session_state.bank_results = []
+        st.info("Enter an amount to see results")
+        return
+
+    with st.spinner("Calculating interest rates..."):
+        # Calculate and display results for each bank
+        bank_results = []
+        # Every bank reads the same immutable requirements, so nothing is copied per bank
+        for bank_name in _BANK_ORDER:
+            results = _cached_bank_interest(
+                bank_name,
+                investment_amount,
+                base_requirements,
+                rates_mtime
+            )
+            bank_results.append({
+                'bank': bank_name,
+                'monthly_interest': results['total_interest']/12,
+                'annual_interest': results['total_interest'],
+                'breakdown': results['breakdown']
+            })
+        
+        # Store bank_results in session state
+        st.session_state.bank_results = bank_results
+
+        # Sort banks by interest rate (highest to lowest)
+        bank_results.sort(key=lambda x: x['annual_interest'], reverse=True)
+        
+        # Display Optimal Bank First
+        optimal_bank = bank_results[0]
+        st.success(f"🏆 Optimal Choice: **{optimal_bank['bank']}** offers the highest interest rate!")
+        
+        st.metric("Monthly Interest", f"${optimal_bank['monthly_interest']:,.2f}")
+        st.metric("Annual Interest", f"${optimal_bank['annual_interest']:,.2f}")
+
+        
+        # The optimal bank's breakdown is shown once, in its expanded details below
+        if optimal_bank['breakdown']:
+            st.markdown("[See the interest breakdown below →](#details-of-all-banks)")
+        
+        # Divider between optimal and all results
+        st.markdown("---")
+        
+        # Display All Bank Results
+        st.write("### Details of all banks")
+
+
+        # Define bank URLs
+        bank_urls = {
+            "UOB One": "https://www.uob.com.sg/personal/save/chequeing/one-account.page",
+            "OCBC 360": "https://www.ocbc.com/personal-banking/deposits/360-account",
+            "SC BonusSaver": "https://www.sc.com/sg/save/current-accounts/bonussaver/",
+            "BOC SmartSaver": "https://www.bankofchina.com/sg/pbservice/pb1/202212/t20221230_22348761.html",
+            "Chocolate": "https://www.chocolatefinance.com/#Benefits"
+        }
+        
+
+
+        # On mobile only the top 3 banks are shown until the user asks for the rest
+        shown_results = bank_results
+        if not st.session_state.get('is_session_pc', True) and not st.session_state.get('show_all_banks', False):
+            shown_results = bank_results[:3]
+
+        for result in shown_results:
+            with st.expander(f"{result['bank']} Details", expanded=result is optimal_bank):
+                # Create two columns for Monthly and Annual Interest
+                st.metric("Monthly Interest", f"${result['monthly_interest']:,.2f}")
+                st.metric("Annual Interest", f"${result['annual_interest']:,.2f}")
+
+                                                # Add bank URL if available
+            
+                # Show breakdown with fixed formatting
+                if result['breakdown']:
+                    _render_breakdown(result['breakdown'])
+
+                                            
+                if result['bank'] == "Chocolate":
+                    st.write("Notes:")
+                    st.text("• Chocolate Finance targets 3% p.a. on any amount above $50K, but since this is only a target and not guaranteed, it has not been included in the calculation.")                
+
+                if result['bank'] == "OCBC 360":
+                    st.write("Notes:")
+                    st.text("• OCBC's website calculator may show slightly different results because they calculate interest based on a 31-day month.")                
+
+                if result['bank'] == "UOB One":
+                    st.write("Notes:")
+                    st.text("• There might be a further annual cash rebate of S$200. This has not been included in the calculations")  
+
+                if result['bank'] in bank_urls:
+                    col1, col2 = st.columns(2)
+                    with col1:
+                        st.markdown(f"🔍 Verify by visiting [{result['bank']}'s website →]({bank_urls[result['bank']]})")
+                    with col2:
+                        st.markdown("📝 Calculations look wrong? [Provide feedback →](/Feedback)")
+
+        if len(shown_results) < len(bank_results):
+            # The callback runs before the rerun, so that rerun already shows every bank
+            st.button("Show all banks", key="show_all_banks_button", on_click=_show_all_banks)
+
+def _render_ai_response(messages):
+    """Show the AI response as it streams in and return the sanitized text"""
+    placeholder = st.empty()
+    with st.spinner("Thinking..."):
+        stream = stream_ai_response(messages)
+        # The spinner covers the wait for the first piece only
+        response = next(stream, "")
+    placeholder.markdown(sanitize_ai_output(response))
+    for chunk in stream:
+        response += chunk
+        placeholder.markdown(sanitize_ai_output(response))
+    return sanitize_ai_output(response)
+
+@st.fragment
+def render_chat(bank_results, user_data):
+    """AI chat panel, run as a fragment so chat messages don't rerun the calculator"""
+    # Add AI chat interface here
+    st.markdown("---")
+    st.write("### 💬 Ask AI about your results")
+    
+    if not OPENAI_AVAILABLE:
+        st.warning("""
+        The AI assistant is currently unavailable because the OpenAI API key is not configured.
+        
+        **For administrators:** Please set the OPENAI_API_KEY in the Streamlit Cloud secrets or .env file.
+        """)
+    else:
+        # Initialize chat session if not already done
+        initialize_chat_session()
+        
+        # Only push new context and suggestions when the results or inputs changed
+        results_key = hash((
+            tuple((result['bank'], result['annual_interest']) for result in bank_results),
+            tuple(sorted(user_data.items()))
+        ))
+        if st.session_state.get('chat_results_key') != results_key:
+            update_chat_with_calculation(bank_results, user_data)
+            st.session_state.chat_suggestions = generate_suggestions(bank_results)
+            st.session_state.chat_results_key = results_key
+            # New suggestions start with nothing picked
+            st.session_state.pop('suggestion_pills', None)
+            st.session_state.pop('_last_pill', None)
+        suggestions = st.session_state.chat_suggestions
+        
+        # Display chat history first (before any new messages are added)
+        for message in st.session_state.get('chat_messages', []):
+            with st.chat_message(message["role"]):
+                st.markdown(message["content"])
+        
+        # Display suggestion chips as a single pills widget
+        suggestion = st.pills("Try asking:", suggestions, selection_mode="single", key="suggestion_pills")
+        
+        # The pill stays selected across reruns, so only a newly picked one is sent.
+        # Deselecting forgets the last pick so the same suggestion can be asked again
+        if suggestion is None:
+            st.session_state.pop('_last_pill', None)
+        elif suggestion != st.session_state.get('_last_pill'):
+            st.session_state._last_pill = suggestion
+            
+            # Add user message to session state
+            add_user_message(suggestion)
+            
+            # Display user message
+            with st.chat_message("user"):
+                st.markdown(suggestion)
+            
+            # Get AI response
+            with st.chat_message("assistant"):
+                response = _render_ai_response(get_api_messages())
+            
+            # Add assistant response to session state
+            add_assistant_message(response)
+        
+        # Chat input - now outside of any container
+        user_input = st.chat_input("Ask a question about your results...")
+        
+        if user_input:
+            # Add user message to session state
+            sanitized_input = sanitize_user_input(user_input)
+            add_user_message(sanitized_input)
+            
+            # Display user message
+            with st.chat_message("user"):
+                st.markdown(user_input)
+            
+            # Get AI response
+            with st.chat_message("assistant"):
+                response = _render_ai_response(get_api_messages())
+            
+            # Add assistant response to session state
+            add_assistant_message(response)
+
 def streamlit_app():
 
     # Initialize session state for PC detection if not exists
@@ -649,8 +881,8 @@ def streamlit_app():
                 'variant': variant
             })
 
-        # Then: Load interest rates data
-        banks_data = process_interest_rates()
+        # Then: Note the rates file version; the results fragment loads the rates through the cache
+        rates_mtime = os.path.getmtime(INTEREST_RATES_FILE)
         
         # Custom CSS for the header
         st.markdown(f"""
@@ -713,10 +945,15 @@ def streamlit_app():
                             value="10,000",
                             help="Enter amount with commas (e.g., 100,000)"
                         )
-                        investment_amount = int(amount_str.replace(",", ""))
+                        try:
+                            investment_amount = int(amount_str.translate(_NO_COMMA))
+                        except ValueError:
+                            st.error("Please enter the amount as a whole number, e.g. 100,000")
+                            st.stop()
                         
-                        # Track page view
-                        if MIXPANEL_ENABLED:
+                        # Track the amount only when it changed, not on every rerun
+                        if MIXPANEL_ENABLED and st.session_state.get('_last_savings') != amount_str:
+                            st.session_state._last_savings = amount_str
                             mp.track(st.session_state.user_id, 'Savings Entered (Text Input)', {
                                 'savings': amount_str,
                                 'variant': variant
@@ -734,8 +971,9 @@ def streamlit_app():
                         )
                         investment_amount = int(amount_str)
 
-                                        # Track page view
-                        if MIXPANEL_ENABLED:
+                        # Track the amount only when it changed, not on every rerun
+                        if MIXPANEL_ENABLED and st.session_state.get('_last_savings') != amount_str:
+                            st.session_state._last_savings = amount_str
                             mp.track(st.session_state.user_id, 'Savings Entered (Slider)', {
                                 'savings': amount_str,
                                 'variant': variant
@@ -820,21 +1058,20 @@ def streamlit_app():
                             help="OCBC 360: Maintain an average daily balance of at least S$200,000.")
 
                     # Create base requirements dictionary (moved outside tabs)
-                    base_requirements = {
-                        'has_salary': bool(has_salary and salary_amount >= 2000),
-                        'salary_amount': salary_amount,
-                        'spend_amount': card_spend,
-                        'giro_count': giro_count,
-                        'has_insurance': has_insurance,
-                        'has_investments': has_investments,
-                        'increased_balance': increased_balance,
-                        'grew_wealth': grew_wealth,
-                        'insurance_amount': insurance_amount if has_insurance else 0,
-                        'investment_amount': investment_amount if has_investments else 0,
-                        'has_home_loan': has_home_loan,
-                        'home_loan_amount': home_loan_amount if has_home_loan else 0,
-                        'total_eligible_transactions': 0  # Will be calculated when needed
-                    }
+                    base_requirements = Reqs(
+                        has_salary=bool(has_salary and salary_amount >= 2000),
+                        salary_amount=salary_amount,
+                        spend_amount=card_spend,
+                        giro_count=giro_count,
+                        has_insurance=has_insurance,
+                        has_investments=has_investments,
+                        increased_balance=increased_balance,
+                        grew_wealth=grew_wealth,
+                        insurance_amount=insurance_amount if has_insurance else 0,
+                        investment_amount=investment_amount if has_investments else 0,
+                        has_home_loan=has_home_loan,
+                        home_loan_amount=home_loan_amount if has_home_loan else 0
+                    )
 
                     # Show links differently based on device type
                     if st.session_state.is_session_pc:
@@ -881,9 +1118,11 @@ def streamlit_app():
                         if calculate_clicked:
                             st.session_state.show_description = False
                             st.session_state.has_calculated = True
+                            # A new calculation goes back to the shortened mobile list
+                            st.session_state.pop('show_all_banks', None)
                             st.session_state.investment_amount = investment_amount
-                            st.session_state.base_requirements = base_requirements.copy()
-                            track_calculation('single_bank', investment_amount, base_requirements)
+                            st.session_state.base_requirements = base_requirements
+                            track_calculation('single_bank', investment_amount, base_requirements._asdict())
 
                             if MIXPANEL_ENABLED:
                                 mp.track(st.session_state.user_id, 'Calculation Performed', {
@@ -906,137 +1145,7 @@ def streamlit_app():
                             calc_investment_amount = st.session_state.get('investment_amount', investment_amount)
                             calc_base_requirements = st.session_state.get('base_requirements', base_requirements)
                             
-                            with st.spinner("Calculating interest rates..."):
-                                # Calculate and display results for each bank
-                                bank_results = []
-                                for bank_name in ["UOB One", "SC BonusSaver", "OCBC 360", "BOC SmartSaver", "Chocolate", "DBS Multiplier"]:
-                                    bank_reqs = calc_base_requirements.copy()
-                                    
-                                    # Special handling for UOB One
-                                    if bank_name == 'UOB One':
-                                        bank_reqs['has_salary'] = calc_base_requirements.get('has_salary', False)
-                                        bank_reqs['salary_amount'] = calc_base_requirements.get('salary_amount', 0)
-                                    
-                                    results = calculate_bank_interest(
-                                        calc_investment_amount, 
-                                        banks_data[bank_name], 
-                                        bank_reqs
-                                    )
-                                    bank_results.append({
-                                        'bank': bank_name,
-                                        'monthly_interest': results['total_interest']/12,
-                                        'annual_interest': results['total_interest'],
-                                        'breakdown': results['breakdown']
-                                    })
-                                
-                                # Store bank_results in session state
-                                st.session_state.bank_results = bank_results
-
-                                # Sort banks by interest rate (highest to lowest)
-                                bank_results.sort(key=lambda x: x['annual_interest'], reverse=True)
-                                
-                                # Display Optimal Bank First
-                                optimal_bank = bank_results[0]
-                                st.success(f"🏆 Optimal Choice: **{optimal_bank['bank']}** offers the highest interest rate!")
-                                
-                                st.metric("Monthly Interest", f"${optimal_bank['monthly_interest']:,.2f}")
-                                st.metric("Annual Interest", f"${optimal_bank['annual_interest']:,.2f}")
-
-                                
-                                # Show breakdown for optimal bank
-                                if optimal_bank['breakdown']:
-                                    st.write("Interest Breakdown:")
-                                    for tier in optimal_bank['breakdown']:
-                                        try:
-                                            # Convert all values to basic Python types first
-                                            amount_val = float(tier['amount_in_tier'])
-                                            rate_val = float(tier['tier_rate'])
-                                            desc_val = str(tier['description']).strip()
-                                            
-                                            # Build string piece by piece
-                                            bullet = "•"
-                                            amount_str = "${:,.2f}".format(amount_val)
-                                            rate_str = "{:.2f}%".format(rate_val * 100)
-                                            
-                                            # Combine with explicit spaces
-                                            line = f"{bullet} {amount_str} at {rate_str} - {desc_val}"
-                                            
-                                            # Display using text
-                                            st.text(line)
-                                            
-                                        except Exception as e:
-                                            st.error(f"Error formatting tier {i}: {str(e)}")
-                                    st.markdown("[See section below for more details →](#details-of-all-banks)")
-                                
-                                # Divider between optimal and all results
-                                st.markdown("---")
-                                
-                                # Display All Bank Results
-                                st.write("### Details of all banks")
-
-
-                                # Define bank URLs
-                                bank_urls = {
-                                    "UOB One": "https://www.uob.com.sg/personal/save/chequeing/one-account.page",
-                                    "OCBC 360": "https://www.ocbc.com/personal-banking/deposits/360-account",
-                                    "SC BonusSaver": "https://www.sc.com/sg/save/current-accounts/bonussaver/",
-                                    "BOC SmartSaver": "https://www.bankofchina.com/sg/pbservice/pb1/202212/t20221230_22348761.html",
-                                    "Chocolate": "https://www.chocolatefinance.com/#Benefits"
-                                }
-                                
-
-
-                                for result in bank_results:
-                                    with st.expander(f"{result['bank']} Details", expanded=False):
-                                        # Create two columns for Monthly and Annual Interest
-                                        st.metric("Monthly Interest", f"${result['monthly_interest']:,.2f}")
-                                        st.metric("Annual Interest", f"${result['annual_interest']:,.2f}")
-
-                                                                        # Add bank URL if available
-                                    
-                                        # Show breakdown with fixed formatting
-                                        if result['breakdown']:
-                                            st.write("Interest Breakdown:")
-                                            for tier in result['breakdown']:
-                                                try:
-                                                    # Convert all values to basic Python types first
-                                                    amount_val = float(tier['amount_in_tier'])
-                                                    rate_val = float(tier['tier_rate'])
-                                                    desc_val = str(tier['description']).strip()
-                                                    
-                                                    # Build string piece by piece
-                                                    bullet = "•"
-                                                    amount_str = "${:,.2f}".format(amount_val)
-                                                    rate_str = "{:.2f}%".format(rate_val * 100)
-                                                    
-                                                    # Combine with explicit spaces
-                                                    line = f"{bullet} {amount_str} at {rate_str} - {desc_val}"
-                                                    
-                                                    # Display using text
-                                                    st.text(line)
-                                                    
-                                                except Exception as e:
-                                                    st.error(f"Error formatting tier {i}: {str(e)}")
-
-                                                                    
-                                        if result['bank'] == "Chocolate":
-                                            st.write("Notes:")
-                                            st.text("• Chocolate Finance targets 3% p.a. on any amount above $50K, but since this is only a target and not guaranteed, it has not been included in the calculation.")                
-
-                                        if result['bank'] == "OCBC 360":
-                                            st.write("Notes:")
-                                            st.text("• OCBC's website calculator may show slightly different results because they calculate interest based on a 31-day month.")                
-
-                                        if result['bank'] == "UOB One":
-                                            st.write("Notes:")
-                                            st.text("• There might be a further annual cash rebate of S$200. This has not been included in the calculations")  
-
-                                        if result['bank'] in bank_urls:
-                                            col1, col2 = st.columns(2)
-                                            with col1:
-                                                st.markdown(f"🔍 Verify by visiting [{result['bank']}'s website →]({bank_urls[result['bank']]})")
-                                            with col2:
-                                                st.markdown("📝 Calculations look wrong? [Provide feedback →](/Feedback)")
+                            render_bank_results(calc_investment_amount, calc_base_requirements, rates_mtime)
 
                     with tab2:
                         st.write("""
@@ -1061,91 +1170,15 @@ def streamlit_app():
                     # Get bank results from session state
                     bank_results = st.session_state.get('bank_results', [])
                     
-                    # Add AI chat interface here
-                    st.markdown("---")
-                    st.write("### 💬 Ask AI about your results")
-                    
-                    if not OPENAI_AVAILABLE:
-                        st.warning("""
-                        The AI assistant is currently unavailable because the OpenAI API key is not configured.
-                        
-                        **For administrators:** Please set the OPENAI_API_KEY in the Streamlit Cloud secrets or .env file.
-                        """)
-                    else:
-                        # Initialize chat session if not already done
-                        initialize_chat_session()
-                        
-                        # Update chat context with calculation results
-                        update_chat_with_calculation(
-                            bank_results,  # Your calculation results
-                            {
-                                "savings_amount": st.session_state.get('investment_amount', investment_amount),
-                                "has_salary": has_salary,
-                                "salary_amount": salary_amount,
-                                "spend_amount": card_spend,
-                                "giro_count": giro_count,
-                                "has_insurance": has_insurance,
-                                "has_investments": has_investments
-                            }
-                        )
-                        
-                        # Generate suggestions based on results
-                        suggestions = generate_suggestions(bank_results)
-                        
-                        # Display chat history first (before any new messages are added)
-                        for message in st.session_state.get('chat_messages', []):
-                            with st.chat_message(message["role"]):
-                                st.markdown(message["content"])
-                        
-                        # Display suggestion chips
-                        st.write("Try asking:")
-                        suggestion_cols = st.columns(len(suggestions))
-                        
-                        # Use a unique key for each button based on suggestion content
-                        for i, suggestion_col in enumerate(suggestion_cols):
-                            suggestion = suggestions[i]
-                            # Create a unique key for each suggestion button
-                            button_key = f"suggestion_{i}_{hash(suggestion)}"
-                            
-                            if suggestion_col.button(suggestion, key=button_key):
-                                # Add user message to session state
-                                add_user_message(suggestion)
-                                
-                                # Display user message
-                                with st.chat_message("user"):
-                                    st.markdown(suggestion)
-                                
-                                # Get AI response
-                                with st.chat_message("assistant"):
-                                    with st.spinner("Thinking..."):
-                                        messages = get_api_messages()
-                                        response = get_ai_response(messages)
-                                        st.markdown(sanitize_ai_output(response))
-                                
-                                # Add assistant response to session state
-                                add_assistant_message(sanitize_ai_output(response))
-                        
-                        # Chat input - now outside of any container
-                        user_input = st.chat_input("Ask a question about your results...")
-                        
-                        if user_input:
-                            # Add user message to session state
-                            sanitized_input = sanitize_user_input(user_input)
-                            add_user_message(sanitized_input)
-                            
-                            # Display user message
-                            with st.chat_message("user"):
-                                st.markdown(user_input)
-                            
-                            # Get AI response
-                            with st.chat_message("assistant"):
-                                with st.spinner("Thinking..."):
-                                    messages = get_api_messages()
-                                    response = get_ai_response(messages)
-                                    st.markdown(sanitize_ai_output(response))
-                            
-                            # Add assistant response to session state
-                            add_assistant_message(sanitize_ai_output(response))
+                    render_chat(bank_results, {
+                        "savings_amount": st.session_state.get('investment_amount', investment_amount),
+                        "has_salary": has_salary,
+                        "salary_amount": salary_amount,
+                        "spend_amount": card_spend,
+                        "giro_count": giro_count,
+                        "has_insurance": has_insurance,
+                        "has_investments": has_investments
+                    })
 
             # This is within col1 already
             except Exception as e:
@@ -1176,120 +1209,98 @@ def optimize_spend_allocation(total_spend, banks_data, deposit_amounts, base_req
         'BOC SmartSaver': 500
     }
     
-    best_allocation = {}
-    best_total_interest = 0
-    best_breakdown = {}
-    
-    def try_allocation(remaining_spend, remaining_banks, current_allocation):
-        nonlocal best_allocation, best_total_interest, best_breakdown
-        
-        # Base case: no more spend to allocate or no more banks
-        if not remaining_banks or remaining_spend < min(min_spends.values()):
-            # Calculate total interest with current allocation
-            total_interest = 0
-            interest_breakdown = {}
-            
-            for bank, spend in current_allocation.items():
-                bank_reqs = base_requirements.copy()
-                bank_reqs['spend_amount'] = spend
-                
-                # Special handling for UOB One
-                if bank == 'UOB One':
-                    bank_reqs['has_salary'] = base_requirements.get('has_salary', False)
-                    bank_reqs['salary_amount'] = base_requirements.get('salary_amount', 0)
-                
-                result = calculate_bank_interest(
-                    deposit_amounts.get(bank, 0), 
-                    banks_data[bank], 
-                    bank_reqs
-                )
-                total_interest += result['total_interest']
-                interest_breakdown[bank] = result
-            
-            if total_interest > best_total_interest:
-                best_allocation = current_allocation.copy()
-                best_total_interest = total_interest
-                best_breakdown = interest_breakdown
-            return
-        
-        # Try allocating spend to next bank
-        current_bank = remaining_banks[0]
-        min_spend = min_spends[current_bank]
-        
-        # Try skipping this bank
-        try_allocation(
-            remaining_spend,
-            remaining_banks[1:],
-            current_allocation
-        )
-        
-        # Try allocating minimum spend to this bank
-        if remaining_spend >= min_spend:
-            new_allocation = current_allocation.copy()
-            new_allocation[current_bank] = min_spend
-            try_allocation(
-                remaining_spend - min_spend,
-                remaining_banks[1:],
-                new_allocation
-            )
-            
-            # For BOC SmartSaver, try higher tier if possible
-            if current_bank == 'BOC SmartSaver' and remaining_spend >= 1500:
-                new_allocation[current_bank] = 1500
-                try_allocation(
-                    remaining_spend - 1500,
-                    remaining_banks[1:],
-                    new_allocation
-                )
+    def get_spend_requirements(spend):
+        # Only the spend differs between banks; UOB One reads the same salary fields as the rest
+        return base_requirements._replace(spend_amount=spend)
     
-    # Start optimization with all banks
+    # Start optimization with all banks whose minimum spend fits in the total
     eligible_banks = [bank for bank in min_spends.keys() 
-                     if bank in deposit_amounts and deposit_amounts[bank] > 0]
-    try_allocation(total_spend, eligible_banks, {})
+                     if bank in deposit_amounts and deposit_amounts[bank] > 0
+                     and min_spends[bank] <= total_spend]
     
-    return best_allocation, best_total_interest, best_breakdown
-
-def calculate_dbs_eligible_transactions(requirements):
-    """Calculate total eligible transactions for DBS Multiplier"""
-    total = 0
+    # Spend levels worth trying per bank: nothing, its minimum, and BOC's higher tier.
+    # Interest only changes at these thresholds, so finer spend steps can't do better
+    spend_options = {}
+    for bank in eligible_banks:
+        options = [0, min_spends[bank]]
+        if bank == 'BOC SmartSaver':
+            options.append(1500)
+        spend_options[bank] = [spend for spend in options if spend <= total_spend]
     
-    # Add salary amount if salary credited
-    if requirements.get('has_salary'):
-        total += requirements.get('salary_amount', 0)
+    # Interest of each bank at each spend level, computed once
+    interest_at_spend = {
+        bank: {
+            spend: calculate_bank_interest(
+                deposit_amounts.get(bank, 0), banks_data[bank], get_spend_requirements(spend), return_breakdown=False
+            )['total_interest']
+            for spend in options if spend > 0
+        }
+        for bank, options in spend_options.items()
+    }
     
-    # Add card spend if exists
-    total += requirements.get('spend_amount', 0)
+    # Drop spend levels that earn no more than a cheaper level of the same bank,
+    # since the cheaper one leaves more spend for other banks and also wins ties
+    for bank, options in spend_options.items():
+        kept = []
+        for spend in options:
+            interest = interest_at_spend[bank].get(spend, 0)
+            if not kept or interest > interest_at_spend[bank].get(kept[-1], 0):
+                kept.append(spend)
+        spend_options[bank] = kept
     
-    # Add insurance amount if category selected
-    if requirements.get('has_insurance'):
-        total += requirements.get('insurance_amount', 0)
-        
-    # Add investment amount if category selected
-    if requirements.get('has_investments'):
-        total += requirements.get('investment_amount', 0)
-        
-    # Add home loan amount if category selected
-    if requirements.get('has_home_loan'):
-        total += requirements.get('home_loan_amount', 0)
+    def is_better(candidate, current):
+        # Ties keep the smallest choices, i.e. the allocation a bank-by-bank search finds first
+        return current is None or candidate[0] > current[0] or (candidate[0] == current[0] and candidate[1] < current[1])
+    
+    # Most interest each bank can add at any of its spend levels, summed over the banks still to visit
+    max_possible = {bank: max([0] + list(interest_at_spend[bank].values())) for bank in eligible_banks}
+    remaining_upper_bound = sum(max_possible.values())
+    
+    # Knapsack over banks: dp maps spend used to (best interest, chosen option index per bank)
+    dp = {0: (0, ())}
+    for bank in eligible_banks:
+        remaining_upper_bound -= max_possible[bank]
+        new_dp = {}
+        for spent, (total_interest, choices) in dp.items():
+            for choice, spend in enumerate(spend_options[bank]):
+                if spent + spend > total_spend:
+                    continue
+                candidate = (
+                    total_interest + interest_at_spend[bank][spend] if spend else total_interest,
+                    choices + (choice,)
+                )
+                if is_better(candidate, new_dp.get(spent + spend)):
+                    new_dp[spent + spend] = candidate
         
-    return total
-
-def count_dbs_categories(requirements):
-    """Count number of valid DBS categories"""
-    count = 0
-    # Credit card spend
-    if requirements.get('spend_amount', 0) > 0:
-        count += 1
-    # Insurance
-    if requirements.get('has_insurance') and requirements.get('insurance_amount', 0) > 0:
-        count += 1
-    # Investment
-    if requirements.get('has_investments') and requirements.get('investment_amount', 0) > 0:
-        count += 1
-    # Home loan
-    if requirements.get('has_home_loan') and requirements.get('home_loan_amount', 0) > 0:
-        count += 1
-    return count
+        # Every state is already a full allocation (later banks skipped), so the best one is an incumbent.
+        # Drop states that can't reach it even if every later bank pays its most (small slack for rounding)
+        incumbent = max(total_interest for total_interest, _ in new_dp.values())
+        dp = {
+            spent: state for spent, state in new_dp.items()
+            if state[0] + remaining_upper_bound >= incumbent - 1e-9
+        }
+    
+    best = None
+    for candidate in dp.values():
+        if is_better(candidate, best):
+            best = candidate
+    
+    best_allocation = {}
+    best_total_interest = 0
+    if best[0] > 0:
+        best_total_interest = best[0]
+        best_allocation = {
+            bank: spend_options[bank][choice]
+            for bank, choice in zip(eligible_banks, best[1]) if choice > 0
+        }
+    
+    # Only the best allocation needs the detailed breakdown
+    best_breakdown = {
+        bank: calculate_bank_interest(deposit_amounts.get(bank, 0), banks_data[bank], get_spend_requirements(spend))
+        for bank, spend in best_allocation.items()
+    }
+    
+    return best_allocation, best_total_interest, best_breakdown
 
 def get_dbs_tier(category_count, total_transactions):
     """
@@ -1,87 +1,156 @@
-import os
 import time
-from openai import OpenAI
+import random
+import functools
+import hashlib
+import json
+import threading
+from collections import OrderedDict
 import logging
-from dotenv import load_dotenv
-from config import DEFAULT_MODEL, MAX_TOKENS, MAX_REQUESTS_PER_MINUTE
-
-# Load environment variables
-load_dotenv()
+# config loads the .env file, so the API key is already in the environment
+from config import OPENAI_API_KEY, DEFAULT_MODEL, MAX_TOKENS, MAX_REQUESTS_PER_MINUTE, RESPONSE_CACHE_SIZE, RESPONSE_CACHE_TTL
 
 # Check if OpenAI API key is available
-OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
 OPENAI_AVAILABLE = bool(OPENAI_API_KEY)
+if not OPENAI_AVAILABLE:
+    logging.warning("OpenAI API key not found. AI features will be disabled.")
 
-# Initialize OpenAI client with error handling
-try:
-    client = OpenAI(api_key=OPENAI_API_KEY)
-    if not OPENAI_AVAILABLE:
-        logging.warning("OpenAI API key not found. AI features will be disabled.")
-except Exception as e:
-    logging.error(f"Error initializing OpenAI client: {str(e)}")
-    OPENAI_AVAILABLE = False
-    client = None
+@functools.lru_cache(maxsize=1)
+def _get_client():
+    """OpenAI client, imported and created on the first chat request rather than at app start"""
+    try:
+        from openai import OpenAI
+        # Retries are handled by stream_ai_response, so the client shouldn't add its own
+        return OpenAI(api_key=OPENAI_API_KEY, max_retries=0)
+    except Exception as e:
+        logging.error(f"Error initializing OpenAI client: {str(e)}")
+        return None
 
-# Track API call rate
-api_call_count = 0
-last_reset_time = time.time()
+def _is_retryable(error):
+    """Connection problems, rate limits and server errors are worth retrying; bad requests are not"""
+    import openai
+    return isinstance(error, (openai.APIConnectionError, openai.RateLimitError, openai.InternalServerError))
 
-def get_ai_response(messages, model=DEFAULT_MODEL, max_tokens=MAX_TOKENS) -> str:
+# Token bucket for the API call rate: refills continuously up to MAX_REQUESTS_PER_MINUTE
+_rate_tokens = float(MAX_REQUESTS_PER_MINUTE)
+_rate_last_refill = time.time()
+_rate_lock = threading.Lock()
+
+def _take_rate_token():
+    """Take a token if one is available, without ever waiting for it"""
+    global _rate_tokens, _rate_last_refill
+    with _rate_lock:
+        now = time.time()
+        _rate_tokens = min(MAX_REQUESTS_PER_MINUTE,
+                           _rate_tokens + (now - _rate_last_refill) * MAX_REQUESTS_PER_MINUTE / 60)
+        _rate_last_refill = now
+        if _rate_tokens < 1:
+            return False
+        _rate_tokens -= 1
+        return True
+
+# Recent responses keyed by a hash of the request, oldest first.
+# Shared by every session's thread, so all access goes through the lock
+_response_cache = OrderedDict()
+_response_cache_lock = threading.Lock()
+
+def _response_cache_key(messages, model, max_tokens):
+    payload = json.dumps([model, max_tokens, messages], sort_keys=True)
+    return hashlib.blake2b(payload.encode(), digest_size=16).digest()
+
+def stream_ai_response(messages, model=DEFAULT_MODEL, max_tokens=MAX_TOKENS):
     """
-    Get a response from the OpenAI API with exponential backoff for retries
+    Yield the response from the OpenAI API piece by piece as it is generated,
+    with exponential backoff for retries before the stream starts
     """
-    global api_call_count, last_reset_time
-    
     # Check if OpenAI is available
     if not OPENAI_AVAILABLE:
-        return "I'm sorry, the AI assistant is currently unavailable because the OpenAI API key is not configured. Please contact the administrator to set up the API key."
+        yield "I'm sorry, the AI assistant is currently unavailable because the OpenAI API key is not configured. Please contact the administrator to set up the API key."
+        return
     
-    # Reset counter if a minute has passed
+    # Reuse a recent answer to the exact same conversation without calling the API
     current_time = time.time()
-    if current_time - last_reset_time >= 60:
-        api_call_count = 0
-        last_reset_time = current_time
+    cache_key = _response_cache_key(messages, model, max_tokens)
+    response_text = None
+    with _response_cache_lock:
+        cached = _response_cache.get(cache_key)
+        if cached is not None:
+            if current_time - cached[1] < RESPONSE_CACHE_TTL:
+                _response_cache.move_to_end(cache_key)
+                response_text = cached[0]
+            else:
+                del _response_cache[cache_key]
+    if response_text is not None:
+        yield response_text
+        return
     
-    # Check if we're over the rate limit
-    if api_call_count > MAX_REQUESTS_PER_MINUTE:
-        wait_time = 60 - (current_time - last_reset_time)
-        if wait_time > 0:
-            logging.warning(f"Rate limit reached. Waiting {wait_time:.2f} seconds.")
-            time.sleep(wait_time)
-            # Reset after waiting
-            api_call_count = 0
-            last_reset_time = time.time()
+    # Answer straight away when over the rate limit instead of blocking the app
+    if not _take_rate_token():
+        logging.warning("Rate limit reached. Skipping API call.")
+        yield "I'm getting a lot of questions right now. Please try again in a few seconds."
+        return
     
-    # Attempt to get a response with exponential backoff
+    client = _get_client()
+    if client is None:
+        yield "I'm sorry, the AI assistant is currently unavailable. Please try again later."
+        return
+    
+    # Attempt to open the response stream with jittered exponential backoff
     max_retries = 5
     base_delay = 1
+    max_delay = 30
     
     for attempt in range(max_retries):
         try:
-            # Increment counter before making the call
-            api_call_count += 1
-            
             # Make the API call
-            response = client.chat.completions.create(
+            stream = client.chat.completions.create(
                 model=model,
                 messages=messages,
-                max_tokens=max_tokens
+                max_tokens=max_tokens,
+                stream=True
             )
-            
-            # Return the response content
-            return response.choices[0].message.content
+            break
             
         except Exception as e:
-            delay = base_delay * (2 ** attempt)
-            logging.warning(f"API error: {str(e)}. Retrying in {delay} seconds.")
-            time.sleep(delay)
-            
+            if not _is_retryable(e):
+                logging.error(f"API error: {str(e)}. Not retrying.")
+                yield f"I'm sorry, I encountered an error: {str(e)}"
+                return
             if attempt == max_retries - 1:
                 logging.error(f"Failed after {max_retries} attempts: {str(e)}")
-                return f"I'm sorry, I encountered an error: {str(e)}"
+                yield f"I'm sorry, I encountered an error: {str(e)}"
+                return
+            
+            # Random delays keep concurrent sessions from retrying in lockstep
+            delay = random.uniform(0, min(max_delay, base_delay * (2 ** attempt)))
+            logging.warning(f"API error: {str(e)}. Retrying in {delay:.1f} seconds.")
+            time.sleep(delay)
     
-    # If we've exhausted all retries
-    return "I'm sorry, I'm having trouble connecting to my knowledge base right now. Please try again later."
+    # Pass each piece on as it arrives; once text has been shown it can't be retried
+    chunks = []
+    try:
+        for event in stream:
+            if not event.choices:
+                continue
+            delta = event.choices[0].delta.content or ""
+            if delta:
+                chunks.append(delta)
+                yield delta
+    except Exception as e:
+        logging.error(f"API error while streaming: {str(e)}")
+        yield "\n\nI'm sorry, my answer was cut off. Please try asking again."
+        return
+    
+    # Only cache complete responses
+    with _response_cache_lock:
+        _response_cache[cache_key] = ("".join(chunks), time.time())
+        if len(_response_cache) > RESPONSE_CACHE_SIZE:
+            _response_cache.popitem(last=False)
+
+def get_ai_response(messages, model=DEFAULT_MODEL, max_tokens=MAX_TOKENS) -> str:
+    """
+    Get the full response from the OpenAI API
+    """
+    return "".join(stream_ai_response(messages, model, max_tokens))
 
 # Add a test function to verify the file is working
 def test_ai():
@@ -89,4 +158,4 @@ def test_ai():
     return "AI utils loaded successfully"
 
 # Make sure the function is exported
-__all__ = ['get_ai_response', 'test_ai', 'OPENAI_AVAILABLE']
\ No newline at end of file
+__all__ = ['get_ai_response', 'stream_ai_response', 'test_ai', 'OPENAI_AVAILABLE']
\ No newline at end of file
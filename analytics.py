@@ -1,7 +1,9 @@
 import streamlit as st
 from datetime import datetime
 import logging
+import queue
 import sys
+import threading
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -15,6 +17,29 @@ logger.addHandler(streamlit_handler)
 MIXPANEL_ENABLED = False
 mp = None  # Define mp at the module level with a default value
 
+
+class QueuedMixpanel:
+    """Mixpanel client whose calls are sent from a background thread, so reruns don't wait on HTTP"""
+    def __init__(self, client):
+        self._client = client
+        self._queue = queue.Queue()
+        threading.Thread(target=self._send_events, daemon=True).start()
+
+    def _send_events(self):
+        while True:
+            method, args, kwargs = self._queue.get()
+            try:
+                getattr(self._client, method)(*args, **kwargs)
+            except Exception as e:
+                logger.error(f"Error sending Mixpanel {method}: {str(e)}")
+
+    def track(self, *args, **kwargs):
+        self._queue.put(('track', args, kwargs))
+
+    def people_set(self, *args, **kwargs):
+        self._queue.put(('people_set', args, kwargs))
+
+
 try:
     logger.info("Attempting to import mixpanel...")
     from mixpanel import Mixpanel
@@ -25,7 +50,7 @@ try:
     logger.info("Successfully retrieved Mixpanel token")
     
     logger.info("Initializing Mixpanel...")
-    mp = Mixpanel(token)
+    mp = QueuedMixpanel(Mixpanel(token))
     MIXPANEL_ENABLED = True
     logger.info("Mixpanel initialization successful")
     
@@ -0,0 +1,114 @@
+import numpy as np
+from bank_params import Reqs, DBS_BASE_RATE, summarize_dbs_requirements
+
+# Vectorized counterparts of the bank_params kernels: each curve returns the yearly
+# interest at every point of an amounts array in one shot
+
+
+def _capped_tiers(amounts, caps, rates, lows=None):
+    """Sum of rate * (part of each amount falling inside each tier)"""
+    if lows is None:
+        # Consecutive tiers of the given sizes
+        lows = np.concatenate(([0.0], np.cumsum(caps)[:-1]))
+        sizes = caps
+    else:
+        sizes = caps - lows
+    amount_in_tier = np.clip(amounts[:, None] - lows[None, :], 0, sizes[None, :])
+    return amount_in_tier @ rates
+
+
+def sc_curve(amounts, reqs, params):
+    rates, mins = params
+    total = amounts * rates[0]
+    eligible = np.minimum(amounts, 100000.0)
+    if reqs.has_salary and reqs.salary_amount >= mins[0]:
+        total = total + eligible * rates[1]
+    if reqs.spend_amount >= mins[1]:
+        total = total + eligible * rates[2]
+    if reqs.has_investments:
+        total = total + eligible * rates[3]
+    if reqs.has_insurance:
+        total = total + eligible * rates[4]
+    return total
+
+
+def uob_curve(amounts, reqs, params):
+    base, salary_caps, salary_rates, giro_caps, giro_rates, spend_caps, spend_rates = params
+    if reqs.spend_amount < 500:
+        return np.minimum(amounts, base[1]) * base[0]
+    # The requirement branches are mutually exclusive, so pick one tier set up front
+    if reqs.has_salary:
+        return _capped_tiers(amounts, salary_caps, salary_rates)
+    if reqs.giro_count >= 3:
+        return _capped_tiers(amounts, giro_caps, giro_rates)
+    return _capped_tiers(amounts, spend_caps, spend_rates)
+
+
+def ocbc_curve(amounts, reqs, params):
+    base_rate, mins, bonus_rates = params
+    first_75k = np.minimum(amounts, 75000.0)
+    next_25k = np.clip(amounts - 75000.0, 0.0, 25000.0)
+    met = np.array([
+        bool(reqs.has_salary and reqs.salary_amount >= mins[0]),
+        bool(reqs.increased_balance),
+        reqs.spend_amount >= mins[1],
+        bool(reqs.has_insurance),
+        bool(reqs.has_investments),
+        bool(reqs.grew_wealth),
+    ])
+    rate_75k, rate_25k = bonus_rates[met].sum(axis=0)
+    return amounts * base_rate + first_75k * rate_75k + next_25k * rate_25k
+
+
+def boc_curve(amounts, reqs, params):
+    base_caps, base_rates, bonuses = params
+    lows = np.concatenate(([0.0], base_caps[:-1]))
+    total = _capped_tiers(amounts, base_caps, base_rates, lows)
+
+    # bonuses rows: salary, wealth, spend $500, spend $1500, payment
+    met = np.zeros(len(bonuses), dtype=bool)
+    met[0] = reqs.has_salary and reqs.salary_amount >= 2000
+    met[1] = bool(reqs.has_insurance)
+    met[3] = reqs.spend_amount >= 1500
+    met[2] = 500 <= reqs.spend_amount < 1500
+    met[4] = reqs.giro_count >= 3
+    bonus = np.minimum(amounts[:, None], bonuses[met, 1][None, :]) @ bonuses[met, 0]
+    # Bonus interest needs the $1,500 minimum balance
+    return total + np.where(amounts >= 1500, bonus, 0.0)
+
+
+def chocolate_curve(amounts, reqs, params):
+    rates, = params
+    return np.minimum(amounts, 20000.0) * rates[0] + np.clip(amounts - 20000.0, 0.0, 30000.0) * rates[1]
+
+
+def dbs_curve(amounts, reqs, params):
+    tiers, = params
+    total_transactions, category_count = summarize_dbs_requirements(reqs)
+    if not reqs.has_salary or total_transactions < 500 or not 1 <= category_count <= 3:
+        return amounts * DBS_BASE_RATE
+    band = 2 if total_transactions >= 30000 else 1 if total_transactions >= 15000 else 0
+    rate, cap = tiers[category_count - 1, band]
+    if cap < 0:
+        return amounts * DBS_BASE_RATE
+    return np.minimum(amounts, cap) * rate + np.maximum(amounts - cap, 0.0) * DBS_BASE_RATE
+
+
+BANK_CURVES = {
+    'SC BonusSaver': sc_curve,
+    'UOB One': uob_curve,
+    'OCBC 360': ocbc_curve,
+    'BOC SmartSaver': boc_curve,
+    'Chocolate': chocolate_curve,
+    'DBS Multiplier': dbs_curve,
+}
+
+
+def interest_curve(amounts, bank_info, frozen_reqs):
+    """
+    Yearly interest for every deposit in amounts
+    frozen_reqs is a Reqs (or any tuple ordered by REQUIREMENT_FIELDS)
+    """
+    reqs = Reqs(*frozen_reqs)
+    amounts = np.asarray(amounts, dtype=float)
+    return BANK_CURVES[bank_info['bank']](amounts, reqs, bank_info['params'])
@@ -0,0 +1,260 @@
+from collections import namedtuple
+
+import numpy as np
+
+try:
+    from numba import njit
+except ImportError:
+    # Without numba the kernels simply run as plain Python
+    def njit(*args, **kwargs):
+        if len(args) == 1 and callable(args[0]):
+            return args[0]
+        return lambda func: func
+
+
+# Requirement fields read by the interest calculations, in a fixed order so they can be hashed
+REQUIREMENT_FIELDS = (
+    'has_salary', 'salary_amount', 'spend_amount', 'giro_count',
+    'has_investments', 'has_insurance', 'increased_balance', 'grew_wealth',
+    'insurance_amount', 'investment_amount', 'has_home_loan', 'home_loan_amount'
+)
+
+# Immutable user requirements; variants are made with _replace instead of copying a dict
+Reqs = namedtuple('Reqs', REQUIREMENT_FIELDS, defaults=(0,) * len(REQUIREMENT_FIELDS))
+
+# OCBC 360 bonus categories, in the order their rates are packed
+OCBC_CATEGORIES = ('salary', 'save', 'spend', 'insure', 'invest', 'grow')
+
+# DBS Multiplier tiers, indexed by [category count - 1][transaction band]
+DBS_BANDS = ('low', 'mid', 'high')
+DBS_BASE_RATE = 0.0005
+
+
+def summarize_dbs_requirements(reqs):
+    """Eligible DBS Multiplier transactions and number of categories for Reqs"""
+    total_transactions = float(reqs.spend_amount)
+    category_count = int(reqs.spend_amount > 0)
+    if reqs.has_salary:
+        total_transactions += reqs.salary_amount
+    for has_category, amount in ((reqs.has_insurance, reqs.insurance_amount),
+                                 (reqs.has_investments, reqs.investment_amount),
+                                 (reqs.has_home_loan, reqs.home_loan_amount)):
+        if has_category:
+            total_transactions += amount
+            category_count += amount > 0
+    return total_transactions, category_count
+
+
+def _rate_and_cap(tier):
+    if tier is None:
+        return np.zeros(2)
+    return np.array([tier['rate'], tier['cap']])
+
+
+def build_bank_params(bank_info):
+    """
+    Pack a bank's tiers into plain NumPy arrays for the interest kernels
+    Expects the numeric fields and lookups added by process_interest_rates
+    """
+    by_type = bank_info['by_type']
+    bank = bank_info['bank']
+
+    if bank == 'SC BonusSaver':
+        rates = np.array([by_type[t][0]['rate'] for t in ('base', 'salary', 'spend', 'invest', 'insure')])
+        mins = np.array([by_type['salary'][0]['min_salary_value'], by_type['spend'][0]['min_spend_value']])
+        return rates, mins
+
+    if bank == 'UOB One':
+        def caps_and_rates(requirement_type):
+            tiers = bank_info['by_requirement'][requirement_type]
+            return np.array([t['cap'] for t in tiers]), np.array([t['rate'] for t in tiers])
+        return (_rate_and_cap(by_type['base'][0]),) + caps_and_rates('salary') + caps_and_rates('giro') + caps_and_rates('spend_only')
+
+    if bank == 'OCBC 360':
+        index = bank_info['by_type_and_cap']
+        bonus_rates = np.zeros((len(OCBC_CATEGORIES), 2))
+        for i, category in enumerate(OCBC_CATEGORIES):
+            for j, cap in enumerate((75000.0, 25000.0)):
+                tier = index.get((category, cap))
+                if tier is not None:
+                    bonus_rates[i, j] = tier['rate']
+        mins = np.array([by_type['salary'][0]['min_salary_value'], by_type['spend'][0]['min_spend_value']])
+        return by_type['base'][0]['rate'], mins, bonus_rates
+
+    if bank == 'BOC SmartSaver':
+        spend_tiers = bank_info['by_type_and_balance_tier']
+        bonuses = np.array([
+            _rate_and_cap(by_type['salary'][0]),
+            _rate_and_cap(by_type['wealth'][0]),
+            _rate_and_cap(spend_tiers.get(('spend', '1'))),
+            _rate_and_cap(spend_tiers.get(('spend', '2'))),
+            _rate_and_cap(by_type['payment'][0]),
+        ])
+        return bank_info['boc_base_caps'], bank_info['boc_base_rates'], bonuses
+
+    if bank == 'Chocolate':
+        index = bank_info['by_type_and_cap']
+        return (np.array([index[('base', 20000.0)]['rate'], index[('base', 30000.0)]['rate']]),)
+
+    if bank == 'DBS Multiplier':
+        tiers = np.zeros((3, len(DBS_BANDS), 2))
+        tiers[:, :, 1] = -1  # Marks a missing tier
+        for count in range(1, 4):
+            for band_index, band in enumerate(DBS_BANDS):
+                tier_list = by_type.get(f"cat{count}_{band}")
+                if tier_list:
+                    tiers[count - 1, band_index] = _rate_and_cap(tier_list[0])
+        return (tiers,)
+
+    raise ValueError(f"No interest kernel for {bank}")
+
+
+@njit(cache=True)
+def _fill_tiers(amount, caps, rates):
+    # Fill consecutive tiers of the given sizes until the amount runs out
+    total = 0.0
+    remaining = float(amount)
+    for k in range(caps.shape[0]):
+        amount_in_tier = min(remaining, caps[k])
+        if amount_in_tier <= 0:
+            break
+        total += amount_in_tier * rates[k]
+        remaining -= amount_in_tier
+    return total
+
+
+@njit(cache=True)
+def interest_sc(deposit, has_salary, salary_amount, spend_amount, has_investments, has_insurance, rates, mins):
+    total = deposit * rates[0]
+    eligible = min(deposit, 100000.0)
+    if has_salary and salary_amount >= mins[0]:
+        total += eligible * rates[1]
+    if spend_amount >= mins[1]:
+        total += eligible * rates[2]
+    if has_investments:
+        total += eligible * rates[3]
+    if has_insurance:
+        total += eligible * rates[4]
+    return total
+
+
+@njit(cache=True)
+def interest_uob(deposit, has_salary, spend_amount, giro_count, base,
+                 salary_caps, salary_rates, giro_caps, giro_rates, spend_caps, spend_rates):
+    if spend_amount < 500:
+        return min(deposit, base[1]) * base[0]
+    if has_salary:
+        return _fill_tiers(deposit, salary_caps, salary_rates)
+    if giro_count >= 3:
+        return _fill_tiers(deposit, giro_caps, giro_rates)
+    return _fill_tiers(deposit, spend_caps, spend_rates)
+
+
+@njit(cache=True)
+def interest_ocbc(deposit, has_salary, salary_amount, spend_amount, has_insurance, has_investments,
+                  increased_balance, grew_wealth, base_rate, mins, bonus_rates):
+    first_75k = min(deposit, 75000.0)
+    next_25k = min(max(deposit - 75000.0, 0.0), 25000.0)
+    met = (
+        has_salary and salary_amount >= mins[0],
+        increased_balance,
+        spend_amount >= mins[1],
+        has_insurance,
+        has_investments,
+        grew_wealth,
+    )
+    total = deposit * base_rate
+    for i in range(len(met)):
+        if met[i]:
+            total += first_75k * bonus_rates[i, 0] + next_25k * bonus_rates[i, 1]
+    return total
+
+
+@njit(cache=True)
+def interest_boc(deposit, has_salary, salary_amount, spend_amount, giro_count, has_insurance,
+                 base_caps, base_rates, bonuses):
+    total = 0.0
+    prev_cap = 0.0
+    for k in range(base_caps.shape[0]):
+        amount_in_tier = min(max(0.0, deposit - prev_cap), base_caps[k] - prev_cap)
+        if amount_in_tier <= 0:
+            break
+        total += amount_in_tier * base_rates[k]
+        prev_cap = base_caps[k]
+
+    if deposit >= 1500:
+        # bonuses rows: salary, wealth, spend $500, spend $1500, payment
+        if has_salary and salary_amount >= 2000:
+            total += min(deposit, bonuses[0, 1]) * bonuses[0, 0]
+        if has_insurance:
+            total += min(deposit, bonuses[1, 1]) * bonuses[1, 0]
+        if spend_amount >= 1500:
+            total += min(deposit, bonuses[3, 1]) * bonuses[3, 0]
+        elif spend_amount >= 500:
+            total += min(deposit, bonuses[2, 1]) * bonuses[2, 0]
+        if giro_count >= 3:
+            total += min(deposit, bonuses[4, 1]) * bonuses[4, 0]
+    return total
+
+
+@njit(cache=True)
+def interest_chocolate(deposit, rates):
+    total = min(deposit, 20000.0) * rates[0]
+    if deposit > 20000:
+        total += min(deposit - 20000.0, 30000.0) * rates[1]
+    return total
+
+
+@njit(cache=True)
+def interest_dbs(deposit, has_salary, total_transactions, category_count, tiers):
+    if not has_salary or total_transactions < 500 or category_count == 0 or category_count > 3:
+        return deposit * DBS_BASE_RATE
+    if total_transactions >= 30000:
+        band = 2
+    elif total_transactions >= 15000:
+        band = 1
+    else:
+        band = 0
+    rate = tiers[category_count - 1, band, 0]
+    cap = tiers[category_count - 1, band, 1]
+    if cap < 0:
+        return deposit * DBS_BASE_RATE
+    total = min(deposit, cap) * rate
+    if deposit > cap:
+        total += (deposit - cap) * DBS_BASE_RATE
+    return total
+
+
+def calculate_total_interest(deposit_amount, bank_info, reqs):
+    """
+    Total yearly interest only, without the breakdown built by calculate_bank_interest
+    reqs is a Reqs
+    """
+    # Fixed argument types so each kernel is only ever compiled for one signature
+    deposit = float(deposit_amount)
+    has_salary = bool(reqs.has_salary)
+    salary_amount = float(reqs.salary_amount)
+    spend_amount = float(reqs.spend_amount)
+    giro_count = float(reqs.giro_count)
+    has_investments = bool(reqs.has_investments)
+    has_insurance = bool(reqs.has_insurance)
+    params = bank_info['params']
+    bank = bank_info['bank']
+
+    if bank == 'SC BonusSaver':
+        return interest_sc(deposit, has_salary, salary_amount, spend_amount,
+                           has_investments, has_insurance, *params)
+    if bank == 'UOB One':
+        return interest_uob(deposit, has_salary, spend_amount, giro_count, *params)
+    if bank == 'OCBC 360':
+        return interest_ocbc(deposit, has_salary, salary_amount, spend_amount, has_insurance,
+                             has_investments, bool(reqs.increased_balance), bool(reqs.grew_wealth), *params)
+    if bank == 'BOC SmartSaver':
+        return interest_boc(deposit, has_salary, salary_amount, spend_amount, giro_count,
+                            has_insurance, *params)
+    if bank == 'Chocolate':
+        return interest_chocolate(deposit, *params)
+    if bank == 'DBS Multiplier':
+        total_transactions, category_count = summarize_dbs_requirements(reqs)
+        return interest_dbs(deposit, has_salary, float(total_transactions), int(category_count), *params)
+    raise ValueError(f"No interest kernel for {bank}")
@@ -16,6 +16,10 @@ TEMPERATURE = 0.7
 # Rate Limiting
 MAX_REQUESTS_PER_MINUTE = 10  # Adjust based on your API tier
 
+# Response cache for repeated identical conversations
+RESPONSE_CACHE_SIZE = 128
+RESPONSE_CACHE_TTL = 600  # seconds
+
 # System prompts
 FINANCIAL_ASSISTANT_PROMPT = """
 You are a helpful financial assistant for SmartSaverSG, a bank interest rate calculator.
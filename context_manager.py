@@ -1,5 +1,23 @@
 import json
-from datetime import datetime
+import time
+from collections import deque
+
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+
+def _dumps(obj):
+    """Compact JSON string, using orjson when it is installed"""
+    if ORJSON_AVAILABLE:
+        return orjson.dumps(
+            obj, default=str,
+            option=orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
+        ).decode()
+    return json.dumps(obj, default=str, separators=(',', ':'), ensure_ascii=False)
+
 
 class ChatContextManager:
     """
@@ -7,34 +25,36 @@ class ChatContextManager:
     """
     def __init__(self, max_history=10):
         self.max_history = max_history
-        self.conversation_history = []
+        # Oldest messages fall off automatically once max_history is reached
+        self.conversation_history = deque(maxlen=max_history)
         self.user_data = {}
         self.calculation_results = None
-        self.last_updated = datetime.now()
+        # (include_calculation, serialized context), cleared whenever user data or results change
+        self._context_cache = None
+        # Timestamps are plain time.time() floats; format them only when they need to be shown
+        self.last_updated = time.time()
     
     def add_message(self, role, content):
         """Add a message to the conversation history"""
+        now = time.time()
         self.conversation_history.append({
             "role": role,
             "content": content,
-            "timestamp": datetime.now().isoformat()
+            "timestamp": now
         })
-        
-        # Trim history if it exceeds max length
-        if len(self.conversation_history) > self.max_history:
-            self.conversation_history = self.conversation_history[-self.max_history:]
-        
-        self.last_updated = datetime.now()
+        self.last_updated = now
     
     def update_user_data(self, new_data):
         """Update user data (calculator inputs)"""
         self.user_data.update(new_data)
-        self.last_updated = datetime.now()
+        self._context_cache = None
+        self.last_updated = time.time()
     
     def update_calculation_results(self, results):
         """Update the calculation results"""
         self.calculation_results = results
-        self.last_updated = datetime.now()
+        self._context_cache = None
+        self.last_updated = time.time()
     
     def get_formatted_messages(self, system_prompt, include_calculation=True):
         """
@@ -42,18 +62,10 @@ class ChatContextManager:
         """
         messages = [{"role": "system", "content": system_prompt}]
         
-        # Add context about user data and calculation results
-        context = {
-            "user_data": self.user_data
-        }
-        
-        if include_calculation and self.calculation_results:
-            context["calculation_results"] = self.calculation_results
-        
         # Add context as a system message
         messages.append({
             "role": "system", 
-            "content": f"Current user context: {json.dumps(context, default=str)}"
+            "content": f"Current user context: {self._serialized_context(include_calculation)}"
         })
         
         # Add conversation history
@@ -65,12 +77,29 @@ class ChatContextManager:
         
         return messages
     
+    def _serialized_context(self, include_calculation):
+        """User data and calculation results as JSON, reused until either changes"""
+        if self._context_cache is not None and self._context_cache[0] == include_calculation:
+            return self._context_cache[1]
+        
+        # Add context about user data and calculation results
+        context = {
+            "user_data": self.user_data
+        }
+        
+        if include_calculation and self.calculation_results:
+            context["calculation_results"] = self.calculation_results
+        
+        # Compact output keeps the prompt (and token count) smaller
+        serialized = _dumps(context)
+        self._context_cache = (include_calculation, serialized)
+        return serialized
+    
     def clear_history(self):
         """Clear conversation history but keep user data"""
-        self.conversation_history = []
-        self.last_updated = datetime.now()
+        self.conversation_history.clear()
+        self.last_updated = time.time()
     
     def is_context_stale(self, minutes=30):
         """Check if context is stale (hasn't been updated recently)"""
-        time_diff = (datetime.now() - self.last_updated).total_seconds() / 60
-        return time_diff > minutes
\ No newline at end of file
+        return (time.time() - self.last_updated) > minutes * 60
\ No newline at end of file
@@ -9,22 +9,21 @@ def create_user_prompt(user_data, question):
     """
     Create a formatted prompt with user context and question
     """
-    context = f"""
-Based on the following user information:
-- Savings amount: ${user_data.get('savings_amount', 0):,.2f}
-- Has salary credited: {'Yes' if user_data.get('has_salary', False) else 'No'}
-"""
-    
-    if user_data.get('has_salary', False):
-        context += f"- Salary amount: ${user_data.get('salary_amount', 0):,.2f}\n"
-    
-    context += f"""- Card spend: ${user_data.get('spend_amount', 0):,.2f}
-- Bill payments: {user_data.get('giro_count', 0)}
-- Has insurance: {'Yes' if user_data.get('has_insurance', False) else 'No'}
-- Has investments: {'Yes' if user_data.get('has_investments', False) else 'No'}
-"""
+    has_salary = user_data.get('has_salary', False)
+    parts = [
+        "\nBased on the following user information:\n",
+        f"- Savings amount: ${user_data.get('savings_amount', 0):,.2f}\n",
+        f"- Has salary credited: {'Yes' if has_salary else 'No'}\n",
+    ]
+    if has_salary:
+        parts.append(f"- Salary amount: ${user_data.get('salary_amount', 0):,.2f}\n")
+    parts.append(f"- Card spend: ${user_data.get('spend_amount', 0):,.2f}\n")
+    parts.append(f"- Bill payments: {user_data.get('giro_count', 0)}\n")
+    parts.append(f"- Has insurance: {'Yes' if user_data.get('has_insurance', False) else 'No'}\n")
+    parts.append(f"- Has investments: {'Yes' if user_data.get('has_investments', False) else 'No'}\n")
+    parts.append(f"\n\nUser question: {question}")
     
-    return f"{context}\n\nUser question: {question}"
+    return ''.join(parts)
 
 def generate_suggestions(bank_results):
     """
@@ -35,9 +34,8 @@ def generate_suggestions(bank_results):
                 "How can I maximize my interest?", 
                 "What requirements do banks have?"]
     
-    # Sort banks by interest rate
-    sorted_banks = sorted(bank_results, key=lambda x: x['annual_interest'], reverse=True)
-    top_bank = sorted_banks[0]['bank']
+    # Only the top bank is needed, so no need to sort them all
+    top_bank = max(bank_results, key=lambda x: x['annual_interest'])['bank']
     
     suggestions = [
         f"Why is {top_bank} giving me the highest interest?",
@@ -1,6 +1,15 @@
 import re
 import html
 
+# Patterns compiled once at import rather than on every sanitize call
+_INJECT_RE = re.compile(r'(system:|assistant:|user:)', re.IGNORECASE)
+# Whole and decimal parts of a dollar amount as separate groups
+_MONEY_RE = re.compile(r'\$(\d+)(?:\.(\d+))?')
+_SAFE_TAG_RE = re.compile(r'(</?[bi]>)')
+
+# Tags allowed through sanitize_ai_output, as their markdown equivalents
+_SAFE_TAGS = {'<b>': '**', '</b>': '**', '<i>': '*', '</i>': '*'}
+
 def sanitize_user_input(input_text):
     """
     Sanitize user input to prevent prompt injection and other issues
@@ -15,7 +24,7 @@ def sanitize_user_input(input_text):
     sanitized = html.escape(input_text)
     
     # Remove any potential prompt injection attempts
-    sanitized = re.sub(r'(system:|assistant:|user:)', '', sanitized, flags=re.IGNORECASE)
+    sanitized = _INJECT_RE.sub('', sanitized)
     
     # Limit length
     max_length = 500
@@ -24,6 +33,12 @@ def sanitize_user_input(input_text):
     
     return sanitized.strip()
 
+def _add_commas(match):
+    whole, decimal = match.groups()
+    if decimal is None:
+        return f"${int(whole):,}"
+    return f"${int(whole):,}.{decimal}"
+
 def sanitize_ai_output(output_text):
     """
     Sanitize AI output to ensure safe formatting and consistent style
@@ -36,28 +51,12 @@ def sanitize_ai_output(output_text):
     
     # Format financial figures consistently
     # Find patterns like $X, $X.Y, $X.YZ and add commas for thousands
-    def add_commas(match):
-        num_str = match.group(1)
-        try:
-            if '.' in num_str:
-                whole, decimal = num_str.split('.')
-                whole_with_commas = f"{int(whole):,}"
-                return f"${whole_with_commas}.{decimal}"
-            else:
-                return f"${int(num_str):,}"
-        except ValueError:
-            return match.group(0)
-    
-    output_text = re.sub(r'\$(\d+(?:\.\d+)?)', add_commas, output_text)
-    
-    # Ensure proper formatting of percentages
-    output_text = re.sub(r'(\d+(?:\.\d+)?)%', r'\1%', output_text)
-    
-    # Remove any potential unsafe HTML
-    output_text = html.escape(output_text)
-    
-    # Convert escaped HTML back to safe markdown
-    output_text = output_text.replace('&lt;b&gt;', '**').replace('&lt;/b&gt;', '**')
-    output_text = output_text.replace('&lt;i&gt;', '*').replace('&lt;/i&gt;', '*')
+    if '$' in output_text:
+        output_text = _MONEY_RE.sub(_add_commas, output_text)
+    
+    # Escape any potential unsafe HTML, turning the safe tags into markdown in the same pass.
+    # Splitting on the capturing pattern puts the tags at the odd indexes
+    parts = _SAFE_TAG_RE.split(output_text)
+    output_text = ''.join(_SAFE_TAGS[part] if i % 2 else html.escape(part) for i, part in enumerate(parts))
     
     return output_text
\ No newline at end of file
@@ -1,5 +1,6 @@
 import streamlit as st
 import time
+from operator import itemgetter
 from config import FINANCIAL_ASSISTANT_PROMPT
 
 def initialize_chat_session():
@@ -13,6 +14,7 @@ def initialize_chat_session():
         st.session_state.chat_context = {
             'user_data': {},
             'calculation_results': [],
+            'sorted_results': [],
             'last_updated': time.time()
         }
 
@@ -25,6 +27,10 @@ def update_chat_with_calculation(bank_results, user_data):
     # Update context with new data
     st.session_state.chat_context['user_data'] = user_data
     st.session_state.chat_context['calculation_results'] = bank_results
+    # Sort banks by interest rate (highest to lowest) once per calculation, not per message
+    st.session_state.chat_context['sorted_results'] = sorted(
+        bank_results, key=itemgetter('annual_interest'), reverse=True
+    )
     st.session_state.chat_context['last_updated'] = time.time()
     
     # Clear previous messages when new calculation is performed
@@ -88,26 +94,27 @@ def _format_context_message():
         return ""
     
     user_data = st.session_state.chat_context['user_data']
-    bank_results = st.session_state.chat_context['calculation_results']
+    sorted_banks = st.session_state.chat_context['sorted_results']
     
-    # Sort banks by interest rate (highest to lowest)
-    sorted_banks = sorted(bank_results, key=lambda x: x['annual_interest'], reverse=True)
-    
-    context = "Here is the user's financial information and calculation results:\n\n"
-    
-    # Add user data
-    context += f"Savings amount: ${user_data.get('savings_amount', 0):,.2f}\n"
-    context += f"Has salary credited: {'Yes' if user_data.get('has_salary', False) else 'No'}\n"
-    if user_data.get('has_salary', False):
-        context += f"Salary amount: ${user_data.get('salary_amount', 0):,.2f}\n"
-    context += f"Card spend: ${user_data.get('spend_amount', 0):,.2f}\n"
-    context += f"Bill payments: {user_data.get('giro_count', 0)}\n"
-    context += f"Has insurance: {'Yes' if user_data.get('has_insurance', False) else 'No'}\n"
-    context += f"Has investments: {'Yes' if user_data.get('has_investments', False) else 'No'}\n\n"
+    has_salary = user_data.get('has_salary', False)
+    parts = [
+        "Here is the user's financial information and calculation results:\n\n",
+        # Add user data
+        f"Savings amount: ${user_data.get('savings_amount', 0):,.2f}\n",
+        f"Has salary credited: {'Yes' if has_salary else 'No'}\n",
+    ]
+    if has_salary:
+        parts.append(f"Salary amount: ${user_data.get('salary_amount', 0):,.2f}\n")
+    parts.append(f"Card spend: ${user_data.get('spend_amount', 0):,.2f}\n")
+    parts.append(f"Bill payments: {user_data.get('giro_count', 0)}\n")
+    parts.append(f"Has insurance: {'Yes' if user_data.get('has_insurance', False) else 'No'}\n")
+    parts.append(f"Has investments: {'Yes' if user_data.get('has_investments', False) else 'No'}\n\n")
     
     # Add calculation results
-    context += "Bank interest calculation results (sorted by highest interest):\n"
-    for bank in sorted_banks:
-        context += f"- {bank['bank']}: ${bank['annual_interest']:,.2f} per year (${bank['monthly_interest']:,.2f} per month)\n"
+    parts.append("Bank interest calculation results (sorted by highest interest):\n")
+    parts.extend(
+        f"- {bank['bank']}: ${bank['annual_interest']:,.2f} per year (${bank['monthly_interest']:,.2f} per month)\n"
+        for bank in sorted_banks
+    )
     
-    return context
\ No newline at end of file
+    return ''.join(parts)
\ No newline at end of file
@@ -0,0 +1,62 @@
+import itertools
+import logging
+import os
+import unittest
+
+from bank_curves import BANK_CURVES, interest_curve
+from bank_params import Reqs, calculate_total_interest
+from Calculator import INTEREST_RATES_FILE, calculate_bank_interest, process_interest_rates
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Deposits around each bank's caps and minimum balances
+AMOUNTS = [0, 1000, 1499, 1500, 4999, 5000, 20000, 25000, 50000, 74999, 75000,
+           90000, 100000, 125000, 150000, 200000, 1000000]
+
+
+def requirement_grid():
+    """Requirements straddling every threshold the interest rules check"""
+    for (has_salary, salary_amount, spend_amount, giro_count, has_insurance,
+         has_investments, grew, has_home_loan) in itertools.product(
+            [False, True], [0, 1999, 2000, 3500], [0, 499, 500, 1000, 1500],
+            [0, 3], [False, True], [False, True], [False, True], [False, True]):
+        yield Reqs(
+            has_salary=has_salary, salary_amount=salary_amount, spend_amount=spend_amount,
+            giro_count=giro_count, has_investments=has_investments, has_insurance=has_insurance,
+            increased_balance=grew, grew_wealth=grew,
+            insurance_amount=300 if has_insurance else 0,
+            investment_amount=20000 if has_investments else 0,
+            has_home_loan=has_home_loan, home_loan_amount=1000 if has_home_loan else 0,
+        )
+
+
+class InterestConsistencyTest(unittest.TestCase):
+    """The breakdown path, the interest kernels and the vectorized curves encode the
+    same bank rules three times; they must agree everywhere"""
+
+    @classmethod
+    def setUpClass(cls):
+        logging.disable(logging.WARNING)
+        cls.banks_data = process_interest_rates(os.path.join(REPO_DIR, INTEREST_RATES_FILE), None)
+
+    @classmethod
+    def tearDownClass(cls):
+        logging.disable(logging.NOTSET)
+
+    def test_all_paths_agree(self):
+        for bank_name, bank_info in self.banks_data.items():
+            for reqs in requirement_grid():
+                curve = interest_curve(AMOUNTS, bank_info, reqs)
+                for amount, curve_interest in zip(AMOUNTS, curve):
+                    with self.subTest(bank=bank_name, amount=amount, reqs=reqs):
+                        breakdown_interest = calculate_bank_interest(amount, bank_info, reqs)['total_interest']
+                        kernel_interest = calculate_total_interest(amount, bank_info, reqs)
+                        self.assertAlmostEqual(breakdown_interest, kernel_interest, places=6)
+                        self.assertAlmostEqual(breakdown_interest, float(curve_interest), places=6)
+
+    def test_every_bank_has_a_curve(self):
+        self.assertEqual(set(self.banks_data), set(BANK_CURVES))
+
+
+if __name__ == "__main__":
+    unittest.main()